@@ -76,6 +76,14 @@ Location where necessary hub files are required. (hubs.csv, arcs_blacklist.csv,
             default=None,
             help="Location of where to save output files. Defaults to --dir",
         )
+        parser.add_argument(
+            "-g",
+            "--geocoder",
+            dest="geocoder",
+            default="nominatim",
+            choices=["nominatim", "arcgis"],
+            help="Geocoding service used to locate hubs. arcgis requires `arcgis_token` in the config.",
+        )
         parser.add_argument(
             "-f" "--create_figure",
             dest="create_fig",
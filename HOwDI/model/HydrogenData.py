@@ -11,11 +11,13 @@ import pandas as pd
 import sqlalchemy as db
 import yaml
 from HOwDI.util import (
+    YAMLLoader,
     dict_keys_to_list,
     flatten_dict,
     get_number_of_trials,
     read_config,
     set_index,
+    write_json,
 )
 
 
@@ -236,16 +238,11 @@ class HydrogenData:
         }
 
     def write_output_dataframes(self):
-        [
+        for key, df in self.output_dfs.items():
             df.to_csv(self.outputs_dir / "{}.csv".format(key))
-            for key, df in self.output_dfs.items()
-        ]
 
     def write_output_dict(self):
-        from json import dump
-
-        with (self.outputs_dir / "outputs.json").open("w", encoding="utf-8") as f:
-            dump(self.output_dict, f, ensure_ascii=False, indent=4)
+        write_json(self.output_dict, self.outputs_dir / "outputs.json")
 
     def create_output_dfs(self):
         self.output_dfs = {
@@ -272,7 +269,7 @@ class HydrogenData:
     def read_yaml(self, fn, force_no_error=False):
         try:
             with open(fn) as file:
-                return yaml.load(file, Loader=yaml.FullLoader)
+                return yaml.load(file, Loader=YAMLLoader)
         except FileNotFoundError:
             if not force_no_error:
                 self.raiseFileNotFoundError(fn)
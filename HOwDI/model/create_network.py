@@ -4,8 +4,6 @@ takes input csvs and creates the networkx graph object
 needed to run the Pyomo-based hydrogen model
 """
 
-from itertools import permutations
-
 from networkx import DiGraph
 
 
@@ -15,16 +13,19 @@ def cap_first(s):
     return s[0].upper() + s[1:]
 
 
+FREE_FLOW = {
+    "kmLength": 0.0,
+    "capital_usdPerUnit": 0.0,
+    "fixed_usdPerUnitPerDay": 0.0,
+    "variable_usdPerTon": 0.0,
+    "flowLimit_tonsPerDay": 99999999.9,
+}
+
+
 def free_flow_dict(class_of_flow=None):
     """returns a dict with free flow values"""
-    free_flow = {
-        "kmLength": 0.0,
-        "capital_usdPerUnit": 0.0,
-        "fixed_usdPerUnitPerDay": 0.0,
-        "variable_usdPerTon": 0.0,
-        "flowLimit_tonsPerDay": 99999999.9,
-        "class": class_of_flow,
-    }
+    free_flow = FREE_FLOW.copy()
+    free_flow["class"] = class_of_flow
     return free_flow
 
 
@@ -35,71 +36,95 @@ def initialize_graph(H):
     returns g: a network.DiGraph object
     """
     g = DiGraph()
+    # nodes and edges are collected as (node, data) and (start, end, data)
+    # and added to the graph at once after every hub and arc is read
+    node_list = []
+    edge_list = []
+
+    hub_columns = list(H.hubs.columns)
+    distributor_columns = list(H.distributors.columns)
+
+    # the distribution data does not depend on the hub, so it is read once here
+    # rather than for every hub and every arc
+    truck_distribution = [
+        (truck_type, dict(zip(distributor_columns, truck_values)))
+        for truck_type, *truck_values in H.distributors.itertuples(name=None)
+        if "truck" in truck_type
+    ]
+    # Series where index is flow type and value is flow limit:
+    flow_limit_series = H.distributors["flowLimit_tonsPerDay"]
+
+    # classes of the distribution and demand nodes that are at every hub,
+    # the nodes are named {hub_name}_{class}
+    dist_classes = []
+    for d in H.distributors.index:
+        # add both low and high purity pipelines
+        if d == "pipeline":
+            for purity_type in ["LowPurity", "HighPurity"]:
+                dist_classes.append(f"dist_{d}{purity_type}")
+
+        else:  # trucks are assumed to be high purity
+            dist_classes.append(f"dist_{d}")
+    demand_classes = [
+        f"demand_{demand_type}"
+        for demand_type in ["lowPurity", "highPurity", "fuelStation"]
+    ]
 
-    for hub_name, hub_series in H.hubs.iterrows():
+    for hub_name, *hub_values in H.hubs.itertuples(name=None):
         ### 1) create the nodes and associated data for each hub_name
-        hub_data = dict(hub_series)
+        hub_data = dict(zip(hub_columns, hub_values))
         capital_price_multiplier = hub_data["capital_pm"]
+        center_lowPurity = f"{hub_name}_center_lowPurity"
+        center_highPurity = f"{hub_name}_center_highPurity"
 
         ## 1.1) add a node for each of the hubs, separating low-purity
         # from high-purity (i.e., fuel cell quality)
         for purity_type in ["lowPurity", "highPurity"]:
-            hub_data["hub"] = hub_name
-            hub_data["node"] = "{}_center_{}".format(hub_name, purity_type)
-            hub_data["class"] = "center_{}".format(purity_type)
-
-            g.add_node(hub_data["node"], **hub_data)
+            center_node = f"{hub_name}_center_{purity_type}"
+            center_char = {
+                **hub_data,
+                "hub": hub_name,
+                "node": center_node,
+                "class": f"center_{purity_type}",
+            }
+            node_list.append((center_node, center_char))
 
         ## 1.2) add a node for each distribution type (i.e., pipelines and trucks)
-        for d in H.distributors.index:
-            # add both low and high purity pipelines
-            if d == "pipeline":
-                for purity_type in ["LowPurity", "HighPurity"]:
-                    node_char = {
-                        "node": "{}_dist_{}{}".format(hub_name, d, purity_type),
-                        "class": "dist_{}{}".format(d, purity_type),
-                        "hub": hub_name,
-                    }
-                    g.add_node(node_char["node"], **(node_char))
-
-            else:  # trucks are assumed to be high purity
-                node_char = {
-                    "node": "{}_dist_{}".format(hub_name, d),
-                    "class": "dist_{}".format(d),
-                    "hub": hub_name,
-                }
-                g.add_node(node_char["node"], **(node_char))
+        for node_class in dist_classes:
+            node = f"{hub_name}_{node_class}"
+            node_list.append(
+                (node, {"node": node, "class": node_class, "hub": hub_name})
+            )
 
         ## 1.3) add a node for each demand type
-        for demand_type in ["lowPurity", "highPurity", "fuelStation"]:
-            node_char = {
-                "node": "{}_demand_{}".format(hub_name, demand_type),
-                "class": "demand_{}".format(demand_type),
-                "hub": hub_name,
-            }
-            g.add_node(node_char["node"], **(node_char))
+        for node_class in demand_classes:
+            node = f"{hub_name}_{node_class}"
+            node_list.append(
+                (node, {"node": node, "class": node_class, "hub": hub_name})
+            )
 
         ### 2) connect the hub nodes, distribution nodes, and demand nodes
         ## 2.1) Connect center to pipeline and pipeline to center for each purity
         for purity in ["lowPurity", "highPurity"]:
-            nodeA = "{}_center_{}".format(hub_name, purity)
-            nodeB = "{}_dist_pipeline{}".format(hub_name, cap_first(purity))
-            for arc, flow_direction in zip(
-                permutations((nodeA, nodeB)),
-                ["flow_within_hub", "reverse_flow_within_hub"],
+            nodeA = f"{hub_name}_center_{purity}"
+            nodeB = f"{hub_name}_dist_pipeline{cap_first(purity)}"
+            for (start_node, end_node), flow_direction in (
+                ((nodeA, nodeB), "flow_within_hub"),
+                ((nodeB, nodeA), "reverse_flow_within_hub"),
             ):
                 # this inner for loop iterates over the following connections, with purity x:
                 # xPurity_center -> xPurityPipeline (class: flow_within_hub)
                 # xPurityPipeline -> xPurity_center (class: reverse_flow_within_hub)
-                g.add_edge(*arc, **free_flow_dict(flow_direction))
+                flow_char = free_flow_dict(flow_direction)
+                flow_char["startNode"] = start_node
+                flow_char["endNode"] = end_node
+                edge_list.append((start_node, end_node, flow_char))
 
         ## 2.2) the connection of hub node to truck distribution hub incorporates the
         # capital and fixed cost of the trucks--it represents the trucking fleet that
         # is based out of that hub. The truck fleet size ultimately limits the amount
         # of hydrogen that can flow from the hub node to the truck distribution hub.
-        truck_distribution = H.distributors[H.distributors.index.str.contains("truck")]
-
-        for truck_type, truck_info in truck_distribution.iterrows():
+        for truck_type, truck_info in truck_distribution:
             # costs and flow limits, (note the the unit for trucks is an individual
             #  truck, as compared to km for pipelines--i.e., when the model builds
             # 1 truck unit, it is building 1 truck, but when it builds 1 pipeline
@@ -107,73 +132,115 @@ def initialize_graph(H):
             #  are in terms of km. This is why we separate the truck capital and
             # fixed costs onto this arc, and the variable costs onto the arcs that
             #  go from one hub to another.)
-            depot_char = free_flow_dict("hub_depot_{}".format(truck_type))
-            depot_char["startNode"] = "{}_center_highPurity".format(hub_name)
-            depot_char["endNode"] = "{}_dist_{}".format(hub_name, truck_type)
+            depot_char = free_flow_dict(f"hub_depot_{truck_type}")
+            depot_char["startNode"] = center_highPurity
+            depot_char["endNode"] = f"{hub_name}_dist_{truck_type}"
             depot_char["capital_usdPerUnitPerDay"] = (
-                truck_info.capital_usdPerUnit * capital_price_multiplier
+                truck_info["capital_usdPerUnit"] * capital_price_multiplier
             )
             depot_char["fixed_usdPerUnitPerDay"] = (
-                truck_info.fixed_usdPerUnitPerDay * capital_price_multiplier
+                truck_info["fixed_usdPerUnitPerDay"] * capital_price_multiplier
+            )
+            edge_list.append(
+                (depot_char["startNode"], depot_char["endNode"], depot_char)
             )
-            g.add_edge(depot_char["startNode"], depot_char["endNode"], **depot_char)
 
         ## 2.3) Connect distribution nodes to demand nodes
 
-        # Series where index is flow type and value is flow limit:
-        flow_limit_series = H.distributors["flowLimit_tonsPerDay"]
         # for every distribution node and every demand node,
         # add an edge:
         # Flow from truck distribution and flow from highPurity
         # pipelines can satisfy all types of demand
         for flow_type, flow_limit in flow_limit_series.items():
-            flow_char = free_flow_dict("flow_to_demand_node")
-            flow_char["flowLimit_tonsPerDay"] = flow_limit
+            flow_char = {
+                **FREE_FLOW,
+                "flowLimit_tonsPerDay": flow_limit,
+                "class": "flow_to_demand_node",
+            }
 
             if flow_type == "pipeline":
                 # connect lowPurity pipeline to lowPurity demand
-                distribution_node = "{}_dist_pipelineLowPurity".format(hub_name)
-                demand_node = "{}_demand_lowPurity".format(hub_name)
-                g.add_edge(distribution_node, demand_node, **flow_char)
+                distribution_node = f"{hub_name}_dist_pipelineLowPurity"
+                demand_node = f"{hub_name}_demand_lowPurity"
+                edge_list.append(
+                    (
+                        distribution_node,
+                        demand_node,
+                        {
+                            **flow_char,
+                            "startNode": distribution_node,
+                            "endNode": demand_node,
+                        },
+                    )
+                )
 
                 # connect highPurity demand to every demand type
-                distribution_node = "{}_dist_pipelineHighPurity".format(hub_name)
+                distribution_node = f"{hub_name}_dist_pipelineHighPurity"
             else:
                 # connect trucks to every demand type
-                distribution_node = "{}_dist_{}".format(hub_name, flow_type)
+                distribution_node = f"{hub_name}_dist_{flow_type}"
 
             # iterate over all demand types;
             # all can be satisfied by trucks or highPurity pipelines
             for demand_type in ["fuelStation", "highPurity", "lowPurity"]:
-                demand_node = "{}_demand_{}".format(hub_name, demand_type)
-                g.add_edge(distribution_node, demand_node, **flow_char)
+                demand_node = f"{hub_name}_demand_{demand_type}"
+                edge_list.append(
+                    (
+                        distribution_node,
+                        demand_node,
+                        {
+                            **flow_char,
+                            "startNode": distribution_node,
+                            "endNode": demand_node,
+                        },
+                    )
+                )
 
         ## 2.4) connect the center_lowPurity to the
         # hub_highPurity. We will add a purifier between
         # the two using the add_converters function
-        g.add_edge(
-            "{}_center_lowPurity".format(hub_name),
-            "{}_center_highPurity".format(hub_name),
-            **free_flow_dict("flow_through_purifier")
-        )
+        purifier_char = free_flow_dict("flow_through_purifier")
+        purifier_char["startNode"] = center_lowPurity
+        purifier_char["endNode"] = center_highPurity
+        edge_list.append((center_lowPurity, center_highPurity, purifier_char))
 
     ### 3) create the arcs and associated data that connect hub_names to each other
     #  (e.g., baytown to montBelvieu): i.e., add pipelines and truck routes between
     # connected hub_names
 
     pipeline_data = H.distributors.loc["pipeline"]
+    # capital price multiplier of each hub, {hub: capital_pm}
+    pm_by_hub = H.hubs["capital_pm"].to_dict()
 
-    for start_hub, arc_data in H.arcs.iterrows():
+    for arc_data in H.arcs.itertuples():
         # maybe double index
-        end_hub = arc_data["endHub"]
-        hubs_df = H.hubs[(H.hubs.index == start_hub) | (H.hubs.index == end_hub)]
+        start_hub = arc_data.Index
+        end_hub = arc_data.endHub
 
         # take the average of the two hubs' capital price multiplier to get the pm of the arc
-        capital_price_multiplier = hubs_df["capital_pm"].sum() / 2
+        capital_price_multiplier = (pm_by_hub[start_hub] + pm_by_hub[end_hub]) / 2
 
         # TODO adjust this value, `arc_data['kmLength_euclid]` is the straight line distance
-        pipeline_length = arc_data["kmLength_road"]
-        road_length = arc_data["kmLength_road"]
+        pipeline_length = arc_data.kmLength_road
+        road_length = arc_data.kmLength_road
+
+        # information for the trucking routes between hydrogen hubs,
+        # which is the same in both directions
+        truck_chars = [
+            (
+                truck_type,
+                {
+                    "kmLength": road_length,
+                    "capital_usdPerUnit": 0.0,
+                    "fixed_usdPerUnitPerDay": 0.0,
+                    "flowLimit_tonsPerDay": truck_info["flowLimit_tonsPerDay"],
+                    "variable_usdPerTon": truck_info["variable_usdPerKilometer-Ton"]
+                    * road_length,
+                    "class": f"arc_{truck_type}",
+                },
+            )
+            for truck_type, truck_info in truck_distribution
+        ]
 
         ## 3.1) add a pipeline going in each direction to allow bi-directional flow
         for purity_type in ["LowPurity", "HighPurity"]:
@@ -181,74 +248,73 @@ def initialize_graph(H):
                 # if it's an existing pipeline, we assume it's a low purity pipeline
                 pipeline_exists = 0
             else:
-                pipeline_exists = arc_data["exist_pipeline"]
+                pipeline_exists = arc_data.exist_pipeline
+
+            # the pipeline data is the same in both directions
+            pipeline_char = {
+                "kmLength": pipeline_length,
+                "capital_usdPerUnit": pipeline_data["capital_usdPerUnit"]
+                * pipeline_length
+                * capital_price_multiplier
+                * (1 - pipeline_exists),  # capital costs only apply if pipeline DNE
+                "fixed_usdPerUnitPerDay": pipeline_data["fixed_usdPerUnitPerDay"]
+                * pipeline_length
+                * capital_price_multiplier,
+                "variable_usdPerTon": pipeline_data["variable_usdPerKilometer-Ton"]
+                * pipeline_length,
+                "flowLimit_tonsPerDay": pipeline_data["flowLimit_tonsPerDay"],
+                "class": f"arc_pipeline{purity_type}",
+                "existing": pipeline_exists,
+            }
 
-            for arc in permutations([start_hub, end_hub]):
+            for hub_a, hub_b in ((start_hub, end_hub), (end_hub, start_hub)):
                 # generate node names based on arc and purity
                 # yields ({hubA}_dist_pipeline{purity}, {hubB}_dist_pipeline{purity})
-                node_names = tuple(
-                    map(lambda hub: "{}_dist_pipeline{}".format(hub, purity_type), arc)
+                node_names = (
+                    f"{hub_a}_dist_pipeline{purity_type}",
+                    f"{hub_b}_dist_pipeline{purity_type}",
                 )
 
-                pipeline_char = {
-                    "startNode": node_names[0],
-                    "endNode": node_names[1],
-                    "kmLength": pipeline_length,
-                    "capital_usdPerUnit": pipeline_data["capital_usdPerUnit"]
-                    * pipeline_length
-                    * capital_price_multiplier
-                    * (1 - pipeline_exists),  # capital costs only apply if pipeline DNE
-                    "fixed_usdPerUnitPerDay": pipeline_data["fixed_usdPerUnitPerDay"]
-                    * pipeline_length
-                    * capital_price_multiplier,
-                    "variable_usdPerTon": pipeline_data["variable_usdPerKilometer-Ton"]
-                    * pipeline_length,
-                    "flowLimit_tonsPerDay": pipeline_data["flowLimit_tonsPerDay"],
-                    "class": "arc_pipeline{}".format(purity_type),
-                    "existing": pipeline_exists,
-                }
                 # add the edge to the graph
-                g.add_edge(node_names[0], node_names[1], **(pipeline_char))
+                edge_list.append(
+                    (
+                        node_names[0],
+                        node_names[1],
+                        {
+                            "startNode": node_names[0],
+                            "endNode": node_names[1],
+                            **pipeline_char,
+                        },
+                    )
+                )
 
                 # 2.2) add truck routes and their variable costs,
                 # note that that the capital and fixed costs of the trucks
                 # are stored on the (hubName_center_highPurity, hubName_center_truckType) arcs
                 if purity_type == "HighPurity":
-                    for truck_type, truck_info in truck_distribution.iterrows():
-                        # information for the trucking routes between hydrogen hubs
-
+                    for truck_type, truck_char in truck_chars:
                         # generate node names based on arc and truck_type
                         # yields ({hubA}_dist_{truck_type}, {hubB}_dist_{truck_type})
-                        node_names = tuple(
-                            map(lambda hub: "{}_dist_{}".format(hub, truck_type), arc)
+                        node_names = (
+                            f"{hub_a}_dist_{truck_type}",
+                            f"{hub_b}_dist_{truck_type}",
                         )
 
-                        truck_char = {
-                            "startNode": node_names[0],
-                            "endNode": node_names[1],
-                            "kmLength": road_length,
-                            "capital_usdPerUnit": 0.0,
-                            "fixed_usdPerUnitPerDay": 0.0,
-                            "flowLimit_tonsPerDay": truck_info["flowLimit_tonsPerDay"],
-                            "variable_usdPerTon": truck_info[
-                                "variable_usdPerKilometer-Ton"
-                            ]
-                            * road_length,
-                            "class": "arc_{}".format(
-                                truck_type,
-                            ),
-                        }
                         # add the distribution arc for the truck
-                        g.add_edge(node_names[0], node_names[1], **(truck_char))
+                        edge_list.append(
+                            (
+                                node_names[0],
+                                node_names[1],
+                                {
+                                    "startNode": node_names[0],
+                                    "endNode": node_names[1],
+                                    **truck_char,
+                                },
+                            )
+                        )
 
-    # 4) clean up and return
-    # add startNode and endNode to any edges that don't have them
-    edges_without_startNode = [
-        s for s in list(g.edges) if "startNode" not in g.edges[s]
-    ]
-    for e in edges_without_startNode:
-        g.edges[e]["startNode"] = e[0]
-        g.edges[e]["endNode"] = e[1]
+    g.add_nodes_from(node_list)
+    g.add_edges_from(edge_list)
 
     return g
 
@@ -266,11 +332,16 @@ def add_consumers(g: DiGraph, H):
     # loop through the hubs, add a node for each demand, and connect it to the appropriate demand hub
     # loop through the hub names, add a network node for each type of demand, and add a network arc
     # connecting that demand to the appropriate demand hub
-    for hub_name, hub_data in H.hubs.iterrows():
-        for demand_sector, demand_data in H.demand.iterrows():
-            demand_value = hub_data["{}_tonnesperday".format(demand_sector)]
+    hub_columns = list(H.hubs.columns)
+    demand_columns = list(H.demand.columns)
+
+    for hub_name, *hub_values in H.hubs.itertuples(name=None):
+        hub_data = dict(zip(hub_columns, hub_values))
+        for demand_sector, *demand_values in H.demand.itertuples(name=None):
+            demand_data = dict(zip(demand_columns, demand_values))
+            demand_value = hub_data[f"{demand_sector}_tonnesperday"]
             demand_type = demand_data["demandType"]
-            demand_node = "{}_demand_{}".format(hub_name, demand_type)
+            demand_node = f"{hub_name}_demand_{demand_type}"
 
             # add the demandSector nodes
             if demand_value == 0:
@@ -278,12 +349,9 @@ def add_consumers(g: DiGraph, H):
                 pass
             else:
                 ### 1) Create demand sector nodes
-                demand_sector_char = demand_data.to_dict()
-                demand_sector_class = "demandSector_{}".format(demand_sector)
-                demand_sector_node = "{}_{}".format(
-                    hub_name,
-                    demand_sector_class,
-                )
+                demand_sector_char = demand_data
+                demand_sector_class = f"demandSector_{demand_sector}"
+                demand_sector_node = f"{hub_name}_{demand_sector_class}"
 
                 demand_sector_char["class"] = demand_sector_class
                 demand_sector_char["sector"] = demand_sector
@@ -310,32 +378,33 @@ def add_producers(g: DiGraph, H):
         "electric": H.prod_elec,
         "thermal": H.prod_therm,
     }.items():
-        for prod_type, prod_data_series in prod_df.iterrows():
+        prod_columns = list(prod_df.columns)
+        for prod_type, *prod_values in prod_df.itertuples(name=None):
             try:
-                H.hubs["build_{}".format(prod_type)]
+                H.hubs[f"build_{prod_type}"]
             except KeyError:
                 print(
-                    "The ability to build {} at each location was not specified in "
-                    "'hubs.csv'. Assuming {} can be built at all hubs.".format(
-                        prod_type, prod_type
-                    )
+                    f"The ability to build {prod_type} at each location was not specified in "
+                    f"'hubs.csv'. Assuming {prod_type} can be built at all hubs."
                 )
-                H.hubs["build_{}".format(prod_type)] = 1
+                H.hubs[f"build_{prod_type}"] = 1
 
-            for hub_name, hub_data in H.hubs.iterrows():
+            hub_columns = list(H.hubs.columns)
+            for hub_name, *hub_values in H.hubs.itertuples(name=None):
+                hub_data = dict(zip(hub_columns, hub_values))
                 capital_price_multiplier = hub_data["capital_pm"]
                 ng_price = hub_data["ng_usd_per_mmbtu"]
                 e_price = hub_data["e_usd_per_kwh"]
 
-                if hub_data["build_{}".format(prod_type)] == 0:
+                if hub_data[f"build_{prod_type}"] == 0:
                     # if the node is unable to build that producer type, pass
                     pass
                 else:
-                    purity = prod_data_series["purity"]
-                    prod_node = "{}_production_{}".format(hub_name, prod_type)
-                    destination_node = "{}_center_{}Purity".format(hub_name, purity)
+                    prod_data = dict(zip(prod_columns, prod_values))
+                    purity = prod_data["purity"]
+                    prod_node = f"{hub_name}_production_{prod_type}"
+                    destination_node = f"{hub_name}_center_{purity}Purity"
 
-                    prod_data = prod_data_series.to_dict()
                     prod_data["node"] = prod_node
                     prod_data["type"] = prod_type
                     prod_data["prod_tech_type"] = prod_tech_type
@@ -352,9 +421,7 @@ def add_producers(g: DiGraph, H):
                         ccs_capture_rate = prod_data["ccs_capture_rate"]
                         if ccs_capture_rate > 1:
                             raise ValueError(
-                                "CCS Capture rate is {}%!".format(
-                                    ccs_capture_rate * 100
-                                )
+                                f"CCS Capture rate is {ccs_capture_rate * 100}%!"
                             )
 
                         prod_data["capital_usdPerTonPerDay"] = (
@@ -409,26 +476,33 @@ def add_producers(g: DiGraph, H):
 
     ## EXISTING PRODUCTION
     # loop through the existing producers and add them
-    for prod_type, prod_existing_series in H.producers_existing.iterrows():
-        hub_name = prod_existing_series["hub"]
-        prod_node = "{}_production_{}Existing".format(hub_name, prod_type)
-        destination_node = "{}_center_{}Purity".format(hub_name, purity)
+    # regional prices, {hub: (ng_usd_per_mmbtu, e_usd_per_kwh)}
+    hub_prices = dict(
+        zip(H.hubs.index, zip(H.hubs["ng_usd_per_mmbtu"], H.hubs["e_usd_per_kwh"]))
+    )
+    # purity of each producer type, {prod_type: purity}
+    producer_purity = {
+        **H.prod_elec["purity"].to_dict(),
+        **H.prod_therm["purity"].to_dict(),
+    }
+    existing_columns = list(H.producers_existing.columns)
+    for prod_type, *prod_existing_values in H.producers_existing.itertuples(name=None):
+        prod_exist_data = dict(zip(existing_columns, prod_existing_values))
+        hub_name = prod_exist_data["hub"]
+        purity = producer_purity[prod_type]
+        prod_node = f"{hub_name}_production_{prod_type}Existing"
+        destination_node = f"{hub_name}_center_{purity}Purity"
 
         # get hub data
-        hub_data = H.hubs.loc[hub_name]
+        ng_price, e_price = hub_prices[hub_name]
 
-        prod_exist_data = prod_existing_series.to_dict()
         prod_exist_data["node"] = prod_node
         prod_exist_data["type"] = prod_type
         prod_exist_data["class"] = "producer"
         prod_exist_data["existing"] = 1
-        prod_exist_data["purity"] = prod_data["purity"]
-        prod_exist_data["ng_price"] = (
-            hub_data["ng_usd_per_mmbtu"] * prod_exist_data["ng_mmbtu_per_tonH2"]
-        )
-        prod_exist_data["e_price"] = (
-            hub_data["e_usd_per_kwh"] * prod_exist_data["kWh_perTon"]
-        )
+        prod_exist_data["purity"] = purity
+        prod_exist_data["ng_price"] = ng_price * prod_exist_data["ng_mmbtu_per_tonH2"]
+        prod_exist_data["e_price"] = e_price * prod_exist_data["kWh_perTon"]
         g.add_node(prod_node, **prod_exist_data)
         # add edge
 
@@ -444,84 +518,91 @@ def add_converters(g: DiGraph, H):
     add converters to the graph
     each converter is a node and arc that splits an existing arc into two
     """
+    # regional values, {hub: (capital_pm, e_usd_per_kwh)}
+    hub_regional = dict(
+        zip(H.hubs.index, zip(H.hubs["capital_pm"], H.hubs["e_usd_per_kwh"]))
+    )
+    # nodes of each class, {class: [node]}, in the order they were added to g
+    nodes_by_class = {}
+    for node, node_class in g.nodes(data="class"):
+        nodes_by_class.setdefault(node_class, []).append(node)
+
     # loop through the nodes and converters to add the necessary nodes and arcs
-    for converter, converter_data_series in H.converters.iterrows():
-        if converter_data_series["arc_start_class"] == "pass":
+    converter_columns = list(H.converters.columns)
+    for converter, *converter_values in H.converters.itertuples(name=None):
+        converter_data = dict(zip(converter_columns, converter_values))
+        if converter_data["arc_start_class"] == "pass":
             pass
         else:
-            # For computational efficiency, it would make sense to declare
-            # potential_start_nodes outside of the H.converters.iterrows() loop.
-            # However, since a converter may be connected to another converter,
-            # potential_start_nodes changes on every iteration of H.converters.
+            # Since a converter may be connected to another converter,
+            # converter nodes are added to nodes_by_class as they are created.
             #
             # Thus, when defining converters, a converter that has a start class
             # that is another converter must be defined after the "start class"
             # converter.
 
-            potential_start_nodes = list(g.nodes(data="class"))
-            for node_b4_cv, node_b4_cv_class in potential_start_nodes:
-                if node_b4_cv_class == converter_data_series["arc_start_class"]:
-                    hub_name = g.nodes[node_b4_cv]["hub"]
-                    hub_data = H.hubs.loc[hub_name]
-                    # regional values:
-                    capital_pm = hub_data["capital_pm"]
-                    e_price = hub_data["e_usd_per_kwh"]
-
-                    # add a new node for the converter at the hub
-                    cv_data = converter_data_series.to_dict()
-                    cv_data["converter"] = converter
-                    cv_data["hub"] = hub_name
-                    cv_class = "converter_{}".format(cv_data["converter"])
-                    cv_data["class"] = cv_class
-                    cv_node = "{}_{}".format(hub_name, cv_class)
-                    cv_data["node"] = cv_node
-                    cv_destination = cv_data["arc_end_class"]
-
-                    cv_data["capital_usdPerTonPerDay"] = (
-                        cv_data["capital_usdPerTonPerDay"] * capital_pm
-                    )
-                    cv_data["fixed_usdPerTonPerDay"] = (
-                        cv_data["fixed_usdPerTonPerDay"] * capital_pm
-                    )
-                    cv_data["e_price"] = cv_data["kWh_perTon"] * e_price
-                    g.add_node(cv_node, **cv_data)
-
-                    # grab the tuples of any edges that have the correct arc_end type--
-                    # i.e., any edges where the start_node is equal to the node we are
-                    #  working on in our for loop, and where the end_node has a class equal
-                    #  to the "arc_end_class" parameter in converters_df
-                    change_edges_list = [
-                        (start_node, end_node)
-                        for start_node, end_node in g.edges()
-                        if (
-                            (node_b4_cv == start_node)
-                            & (cv_destination == g.nodes[end_node]["class"])
-                        )
+            potential_start_nodes = list(
+                nodes_by_class.get(converter_data["arc_start_class"], [])
+            )
+            for node_b4_cv in potential_start_nodes:
+                hub_name = g.nodes[node_b4_cv]["hub"]
+                # regional values:
+                capital_pm, e_price = hub_regional[hub_name]
+
+                # add a new node for the converter at the hub
+                cv_data = converter_data.copy()
+                cv_data["converter"] = converter
+                cv_data["hub"] = hub_name
+                cv_class = f"converter_{cv_data['converter']}"
+                cv_data["class"] = cv_class
+                cv_node = f"{hub_name}_{cv_class}"
+                cv_data["node"] = cv_node
+                cv_destination = cv_data["arc_end_class"]
+
+                cv_data["capital_usdPerTonPerDay"] = (
+                    cv_data["capital_usdPerTonPerDay"] * capital_pm
+                )
+                cv_data["fixed_usdPerTonPerDay"] = (
+                    cv_data["fixed_usdPerTonPerDay"] * capital_pm
+                )
+                cv_data["e_price"] = cv_data["kWh_perTon"] * e_price
+                if cv_node not in g:
+                    nodes_by_class.setdefault(cv_class, []).append(cv_node)
+                g.add_node(cv_node, **cv_data)
+
+                # grab the tuples of any edges that have the correct arc_end type--
+                # i.e., any edges where the start_node is equal to the node we are
+                #  working on in our for loop, and where the end_node has a class equal
+                #  to the "arc_end_class" parameter in converters_df
+                change_edges_list = [
+                    (node_b4_cv, end_node)
+                    for end_node in g.succ[node_b4_cv]
+                    if cv_destination == g.nodes[end_node]["class"]
+                ]
+                # insert converter node between "arc_start_class" node
+                # and "arc_end_class" node
+                for start_node, end_node in change_edges_list:
+                    arc_data = g.edges[(start_node, end_node)]
+
+                    # add "arc_start_class" node -> cv_node
+                    start2cv_data = free_flow_dict("flow_to_converter")
+                    free_flow_flowLimit = start2cv_data["flowLimit_tonsPerDay"]
+                    start2cv_data["startNode"] = start_node
+                    start2cv_data["endNode"] = cv_node
+                    start2cv_data["flowLimit_tonsPerDay"] = arc_data[
+                        "flowLimit_tonsPerDay"
                     ]
-                    # insert converter node between "arc_start_class" node
-                    # and "arc_end_class" node
-                    for start_node, end_node in change_edges_list:
-                        arc_data = g.edges[(start_node, end_node)]
-
-                        # add "arc_start_class" node -> cv_node
-                        start2cv_data = free_flow_dict("flow_to_converter")
-                        free_flow_flowLimit = start2cv_data["flowLimit_tonsPerDay"]
-                        start2cv_data["startNode"] = start_node
-                        start2cv_data["endNode"] = cv_node
-                        start2cv_data["flowLimit_tonsPerDay"] = arc_data[
-                            "flowLimit_tonsPerDay"
-                        ]
-                        g.add_edge(start_node, cv_node, **start2cv_data)
-
-                        # add cv_node -> "arc_end_class" node
-                        cv2dest_data = arc_data.copy()
-                        cv2dest_data["startNode"] = cv_node
-                        cv2dest_data["flowLimit_tonsPerDay"] = free_flow_flowLimit
-                        cv2dest_data["class"] = "flow_from_converter"
-                        g.add_edge(cv_node, end_node, **cv2dest_data)
-
-                        # remove "arc_start_class" -> "arc_end_class" node
-                        g.remove_edge(start_node, end_node)
+                    g.add_edge(start_node, cv_node, **start2cv_data)
+
+                    # add cv_node -> "arc_end_class" node
+                    cv2dest_data = arc_data.copy()
+                    cv2dest_data["startNode"] = cv_node
+                    cv2dest_data["flowLimit_tonsPerDay"] = free_flow_flowLimit
+                    cv2dest_data["class"] = "flow_from_converter"
+                    g.add_edge(cv_node, end_node, **cv2dest_data)
+
+                    # remove "arc_start_class" -> "arc_end_class" node
+                    g.remove_edge(start_node, end_node)
 
 
 def add_price_nodes(g: DiGraph, H):
@@ -560,20 +641,18 @@ def add_price_nodes(g: DiGraph, H):
             # add nodes to store pricing information
             for demand_sector, demand_type in demand_sector2type_map.items():
                 # check if demand sector in nodes
-                demand_sector_node = "{}_demandSector_{}".format(ph, demand_sector)
+                demand_sector_node = f"{ph}_demandSector_{demand_sector}"
                 if demand_sector_node in g.nodes():
                     # check if demand type already has a price hub for this hub
                     if demand_type not in demand_types_for_this_ph:
                         # if not, add the price hub
                         demand_types_for_this_ph.append(demand_type)
 
-                        demand_node = ph + "_demand_{}".format(demand_type)
+                        demand_node = f"{ph}_demand_{demand_type}"
                         for p in H.price_tracking_array:
                             # 1) fuelStation prices
                             p = round(p, 2)
-                            ph_node = ph + "_price{}_{:.2f}".format(
-                                cap_first(demand_type), p
-                            )
+                            ph_node = f"{ph}_price{cap_first(demand_type)}_{p:.2f}"
 
                             price_node_dict = {
                                 "node": ph_node,
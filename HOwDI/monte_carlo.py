@@ -3,6 +3,7 @@ import json
 import operator
 from symbol import parameters
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import numpy as np
@@ -200,10 +201,16 @@ def monte_carlo(base_dir=Path("."), monte_carlo_file=None):
     number_of_trials = metadata.get("number_of_trials", 1)
 
     # read base data
-    files = {
-        file.stem: pd.read_csv(file, index_col=0)
-        for file in base_input_dir.glob("*.csv")
-    }
+    # pandas' C parser releases the GIL, so the files can be read concurrently
+    csv_files = list(base_input_dir.glob("*.csv"))
+    read_input = lambda file: pd.read_csv(file, index_col=0)
+    with ThreadPoolExecutor(max_workers=min(8, len(csv_files) or 1)) as executor:
+        files = dict(
+            zip(
+                (file.stem for file in csv_files),
+                executor.map(read_input, csv_files),
+            )
+        )
     settings = read_yaml(base_input_dir / "settings.yml")
 
     def adjust_row_data(row_data, file):
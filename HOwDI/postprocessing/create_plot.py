@@ -5,138 +5,221 @@ Author: Braden Pecora
 In the current version, there are next to no features,
 but the metadata should be fairly easy to access and utilize.
 """
-import json
 import warnings
-from itertools import combinations
+from functools import lru_cache
+from pathlib import Path
 
 import geopandas as gpd
 import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import shapely
+from matplotlib.collections import LineCollection
 from matplotlib.lines import Line2D
-from shapely.wkt import loads
+from pyogrio import read_dataframe, write_dataframe
 
 from HOwDI.arg_parse import parse_command_line
+from HOwDI.util import read_json
 
 # ignore warning about plotting empty frame
 warnings.simplefilter(action="ignore", category=UserWarning)
 
+# resolution used when saving the figure; the figure itself is created at
+# matplotlib's default dpi so that drawing it (e.g., interactively) stays cheap
+FIG_DPI = 300
+
+# keys of each outgoing distribution dict that are used for plotting
+RELEVANT_DIST_KEYS = frozenset(("source_class", "destination", "destination_class"))
+
+# Options for hub by Production, Consumption, or both
+# (the "b" lambdas use the has_production/has_consumption columns set in create_plot)
+HUB_PLOT_TYPE = {
+    "production": {
+        "name": "Production",
+        "b": lambda df: df["has_production"] & ~df["has_consumption"],
+        "edgecolors": None,
+    },
+    "consumption": {
+        "name": "Consumption (Shape)",
+        "b": lambda df: ~df["has_production"] & df["has_consumption"],
+        "edgecolors": "black",
+    },
+    "both": {
+        "name": "Production and Consumption (Shape)",
+        "b": lambda df: df["has_production"] & df["has_consumption"],
+        "edgecolors": "black",
+    },
+}
+
+# Colors of connections
+# DIST_PIPELINE_LOW_PURITY_COLOR = "#9b2226"
+# DIST_PIPELINE_HIGH_PURITY_COLOR = "#6A6262"
+# DIST_TRUCK_LIQUEFIED_COLOR = "#fb8500"
+# DIST_TRUCK_COMPRESSED_COLOR = "#bb3e03"
+DIST_PIPELINE_COLOR = "#6A6262"
+DIST_TRUCK_COLOR = "#fb8500"
+DIST_COLORS = {
+    "dist_pipelineLowPurity": DIST_PIPELINE_COLOR,
+    "dist_pipelineHighPurity": DIST_PIPELINE_COLOR,
+    "dist_truckLiquefied": DIST_TRUCK_COLOR,
+    "dist_truckCompressed": DIST_TRUCK_COLOR,
+}
+
 
 def roads_to_gdf(wd):
     """Converts roads.csv into a GeoDataFrame object
 
     This is necessary since .geojson files can not handle LineStrings with multiple points.
-    Road geodata are stored as csv, where the geodata are stored as literal strings.
-    The shapely.wkt function "loads" can interpret this literal string and convert into a LineString object
+    Road geodata are stored as csv, where the geodata are stored as literal strings (WKT).
+    GDAL's CSV driver parses the "road_geometry" column into LineStrings while reading.
+
+    The result is cached as roads.gpkg (binary geometries) next to roads.csv,
+    and is only rebuilt if roads.csv is newer than the cache.
     """
     # wd is path where 'hubs.geojson' and 'roads.csv' are located
+    roads_file = wd / "roads.csv"
+    cache_file = wd / "roads.gpkg"
+
+    if cache_file.exists() and cache_file.stat().st_mtime >= roads_file.stat().st_mtime:
+        return read_dataframe(cache_file)
 
-    # get hubs for crs
-    hubs = gpd.read_file(wd / "hubs.geojson")
+    # the roads share the CRS of the hubs, which are kept in memory for plotting
+    _, crs = read_hub_locations(wd / "hubs.geojson")
 
     # read csv and convert geometry column
-    roads = gpd.read_file(wd / "roads.csv")
-    roads["geometry"] = roads["road_geometry"].apply(
-        loads
-    )  # convert string into Linestring
-    roads = roads.set_crs(hubs.crs)
-    del roads["road_geometry"]
+    roads = read_dataframe(
+        roads_file, GEOM_POSSIBLE_NAMES="road_geometry", KEEP_GEOM_COLUMNS="NO"
+    )
+    roads = roads.set_crs(crs)
+    roads.to_file(cache_file, driver="GPKG")
 
     return roads
 
 
-def _all_possible_combos(items: list, existing=False) -> list:
-    """Returns a list of all possible combos as sets.
-
-    If "existing" is True, extends items with a duplicate of items
-    where each item in items is followed by "Existing"
+def read_texas_counties(shpfile):
+    """Reads the Texas counties from a US county shapefile
 
-    For example
+    The state is filtered by GDAL (an OGR SQL `where` clause),
+    so counties outside of Texas are never loaded.
+    Geometries are read in bulk through Arrow if pyarrow is installed.
+    """
+    kwargs = {"where": "STATE_NAME = 'Texas'", "columns": ["STATE_NAME"]}
+    try:
+        return read_dataframe(shpfile, use_arrow=True, **kwargs)
+    except RuntimeError:
+        # pyarrow is not installed
+        return read_dataframe(shpfile, **kwargs)
 
-    all_possible_combos([1,2,3])
-    returns
-    [{1}, {2}, {3}, {1, 2}, {1, 3}, {2, 3}, {1, 2, 3}]
 
-    This function is used for filtering dataframes.
-    The dataframe has a set corresponding to the production
-    types at each hub. For example, a hub could have a corresponding
-    production value of {"smr","smrExisting"} or just {"smr",}, and we
-    want to see if all values of this set are in the list "items" of production
-    types (defined by therm/elec_production.csv "type" column).
-    To do this, we must turn "items" into a list of all possible combinations.
+def get_texas_boundary(shpfile):
+    """Returns a GeoDataFrame with the outline of Texas (the dissolved Texas counties)
 
+    The outline is cached as a GeoPackage next to the shapefile,
+    and is only rebuilt if the shapefile is newer than the cache.
+    It is also kept in memory for repeated plots (e.g., one per scenario)
+    until the shapefile changes.
     """
-    if existing == True:
-        # append "Existing" versions
-        items.extend([i + "Existing" for i in items])
-    out = []
-    for length in range(len(items)):
-        out.extend([frozenset(combo) for combo in combinations(items, length + 1)])
-    return out
-
-
-def _find_max_length_set_from_list(a: list):
-    """From a list of sublists (or similar sub-object),
-    returns the longest sublist (or sub-object as a list)"""
-    return list(max(a))
-
-
-def _diff_of_list(a: list, b: list) -> list:
-    """From two outputs of 'all_possible_combos',
-    gets all possible difference sets
-
-    For example, if the items in "a" are {A,B,C} and the
-    items in "b" are {1,2,3}, this would return
-    [{A,1},{A,2},{A,3},{A,1,2},{A,1,3},{A,2,3},{A,B,1},...]
-    but wouldn't include sets where all items are contained by
-    either a or b.
-    """
+    shpfile = Path(shpfile)
+    return _get_texas_boundary(shpfile, shpfile.stat().st_mtime)
+
 
-    # get the unique items from a and b,
-    # basically undo all_possible_combos
-    # just an easy way of not writing the same thing twice
-    a_unique, b_unique = map(_find_max_length_set_from_list, (a, b))
+@lru_cache(maxsize=4)
+def _get_texas_boundary(shpfile, mtime):
+    cache_file = shpfile.with_name(shpfile.stem + "_texas.gpkg")
+
+    if cache_file.exists() and cache_file.stat().st_mtime >= mtime:
+        return read_dataframe(cache_file)
+
+    tx_county = read_texas_counties(shpfile)
+    # a single union of all geometries, without dissolve's groupby machinery
+    tx = gpd.GeoDataFrame(
+        geometry=[shapely.unary_union(tx_county.geometry.values)], crs=tx_county.crs
+    )
+    tx.to_file(cache_file, driver="GPKG")
+    return tx
 
-    # get all possible combos between a_unique and b_unique
-    all_possible = _all_possible_combos(a_unique + b_unique)
 
-    # find the difference
-    difference = set(all_possible) - set(a) - set(b)
-    return list(difference)
+def read_hub_locations(hubs_file):
+    """Returns the locations of the hubs in hubs.geojson as a dictionary {hub: [x, y]},
+    and the CRS of the file
 
+    Kept in memory for repeated plots until the file changes."""
+    hubs_file = Path(hubs_file)
+    return _read_hub_locations(hubs_file, hubs_file.stat().st_mtime)
 
-def create_plot(H):
+
+@lru_cache(maxsize=4)
+def _read_hub_locations(hubs_file, mtime):
+    hub_points = read_dataframe(hubs_file, columns=["hub"])
+    locations = dict(
+        zip(
+            hub_points["hub"].to_numpy(),
+            shapely.get_coordinates(hub_points.geometry.values).tolist(),
+        )
+    )
+    return locations, hub_points.crs
+
+
+def _tech_bits(techs, tech_bits):
+    """Returns a set of production techs as a bitmask, with one bit per tech
+    in tech_bits; techs missing from tech_bits share the next bit"""
+    other = 1 << len(tech_bits)
+    bits = 0
+    for tech in techs:
+        bits |= tech_bits.get(tech, other)
+    return bits
+
+
+def _production_bits(production, tech_bits):
+    """Returns the production techs at each hub as a bitmask (0 if none),
+    where production is a Categorical of the sets of techs at each hub.
+
+    Each distinct set is converted once and mapped to the hubs by its code.
+    """
+    category_bits = [_tech_bits(techs, tech_bits) for techs in production.categories]
+    # the code of hubs without production is -1, which picks the trailing 0
+    return np.array(category_bits + [0], dtype=np.int64)[production.codes]
+
+
+def _hub_pairs(a, b):
+    """Returns the pairs of hubs in Series a and b as (first, last) tuples,
+    so that a connection and its reverse have the same pair"""
+    return zip(a.where(a < b, b), b.where(a < b, a))
+
+
+def create_plot_data(H):
     """
     Parameters:
     H is a HydrogenData object with the following:
 
     H.hubs_dir: directory where hubs geo files are stored (hubs.geojson, roads.csv)
     H.output_dict: output dictionary of model
-    H.shpfile: location of shapefile to use as background
-    H.prod_therm and H.prod_elec: DataFrame with column "Type",
-     used for determining if a node has thermal, electric, or both types of production.
 
     Returns:
-    fig: a matplotlib.plt object which is a figure of the results.
+    hubs: a GeoDataFrame of the hubs with distribution, as points
+    connections: a GeoDataFrame of the distribution connections between hubs,
+     following the roads in roads.csv
     """
-    plt.rc("font", family="Franklin Gothic Medium")
-
-    hub_data = json.load(open(H.hubs_dir / "hubs.geojson"))["features"]
-    locations = {d["properties"]["hub"]: d["geometry"]["coordinates"] for d in hub_data}
+    locations, crs = read_hub_locations(H.hubs_dir / "hubs.geojson")
 
     # clean data
     def get_relevant_dist_data(hub_data):
-        # returns a list of dicts used in a dict comprehension with only the `relevant_keys`
-        outgoing_dicts = hub_data["distribution"]["outgoing"]
-        relevant_keys = ["source_class", "destination", "destination_class"]
-        for _, outgoing_dict in outgoing_dicts.items():
-            for key in list(outgoing_dict.keys()):
-                if key not in relevant_keys:
-                    del outgoing_dict[key]
-        return [outgoing_dict for _, outgoing_dict in outgoing_dicts.items()]
+        # returns a list of dicts used in a dict comprehension with only the `RELEVANT_DIST_KEYS`
+        # (new dicts are built, so H.output_dict is left unchanged)
+        return [
+            {
+                key: value
+                for key, value in outgoing_dict.items()
+                if key in RELEVANT_DIST_KEYS
+            }
+            for outgoing_dict in hub_data["distribution"]["outgoing"].values()
+        ]
 
     dist_data = {
         hub: get_relevant_dist_data(hub_data)
         for hub, hub_data in H.output_dict.items()
-        if hub_data["distribution"] != {"local": {}, "outgoing": {}, "incoming": {}}
+        # hubs with any local, outgoing, or incoming distribution
+        if any(hub_data["distribution"].values())
     }
 
     def get_relevant_p_or_c_data(hub_data_p_or_c):
@@ -197,44 +280,97 @@ def create_plot(H):
         for hub, prod_capacity in prod_capacity.items()
     }
 
-    features = []
-    for hub, hub_connections in dist_data.items():
-        hub_latlng = locations[hub]
-        hub_geodata = {
-            "type": "Feature",
-            "geometry": {"type": "Point", "coordinates": hub_latlng},
-            "properties": {
-                "name": hub,
-                "production": prod_data[hub],
-                "consumption": cons_data[hub],
-                "production_capacity": prod_capacity[hub],
-                "production_marker_size": prod_capacity_marker_size[hub],
-            },
-        }
-        features.append(hub_geodata)
+    # hubs with distribution data, as points
+    hub_names = list(dist_data)
+    hubs = gpd.GeoDataFrame(
+        {
+            # the sets of production and consumption types repeat across hubs,
+            # so they are stored as categoricals; comparisons (e.g., isin) then only
+            # check each distinct set once and work on the integer codes
+            "production": pd.Categorical([prod_data[hub] for hub in hub_names]),
+            "consumption": pd.Categorical([cons_data[hub] for hub in hub_names]),
+            "production_capacity": [prod_capacity[hub] for hub in hub_names],
+            "production_marker_size": [
+                prod_capacity_marker_size[hub] for hub in hub_names
+            ],
+        },
+        geometry=shapely.points(
+            np.array([locations[hub] for hub in hub_names], dtype=float).reshape(-1, 2)
+        ),
+        index=pd.Index(hub_names, name="hub"),
+        crs=crs,
+    )
 
+    # connections between hubs, as straight lines
+    starts, ends, dist_types = [], [], []
+    for hub, hub_connections in dist_data.items():
         for hub_connection in hub_connections:
-            dest = hub_connection["destination"]
-            dist_type = hub_connection["source_class"]
-            dest_latlng = locations[dest]
-
-            line_geodata = {
-                "type": "Feature",
-                "geometry": {
-                    "type": "LineString",
-                    "coordinates": [hub_latlng, dest_latlng],
-                },
-                "properties": {
-                    "name": hub + " to " + dest,
-                    "start": hub,
-                    "end": dest,
-                    "dist_type": dist_type,
-                },
-            }
-            features.append(line_geodata)
+            starts.append(hub)
+            ends.append(hub_connection["destination"])
+            dist_types.append(hub_connection["source_class"])
+
+    connections = gpd.GeoDataFrame(
+        {
+            "start": starts,
+            "end": ends,
+            "dist_type": dist_types,
+        },
+        geometry=shapely.linestrings(
+            np.array(
+                [
+                    [locations[start], locations[end]]
+                    for start, end in zip(starts, ends)
+                ],
+                dtype=float,
+            ).reshape(-1, 2, 2)
+        ),
+        crs=crs,
+    )
+
+    if not connections.empty:
+        # get data from roads csv, which draws out the road path along a connection
+        # (comment this out to use straight lines)
+        roads = roads_to_gdf(H.hubs_dir)
 
-    geo_data = {"type": "FeatureCollection", "features": features}
-    distribution = gpd.GeoDataFrame.from_features(geo_data)
+        # get road geodata for each connection in connections df,
+        # matching roads and connections by their pair of hubs in either direction
+        road_geometry = dict(
+            zip(_hub_pairs(roads["startHub"], roads["endHub"]), roads.geometry.values)
+        )
+        geometry = pd.Series(
+            [
+                road_geometry.get(pair)
+                for pair in _hub_pairs(connections["start"], connections["end"])
+            ],
+            index=connections.index,
+            dtype=object,
+        )
+        has_road = geometry.notnull()
+        connections.loc[has_road, "geometry"] = geometry[has_road].to_numpy()
+
+    return hubs, connections
+
+
+def create_plot(H, hubs=None, connections=None):
+    """
+    Parameters:
+    H is a HydrogenData object with the following:
+
+    H.hubs_dir: directory where hubs geo files are stored (hubs.geojson, roads.csv)
+    H.output_dict: output dictionary of model
+    H.shpfile: location of shapefile to use as background
+    H.prod_therm and H.prod_elec: DataFrame with column "Type",
+     used for determining if a node has thermal, electric, or both types of production.
+
+    hubs and connections: outputs of create_plot_data, created from H if not given
+
+    Returns:
+    fig: a matplotlib.plt object which is a figure of the results.
+    """
+    plt.rc("font", family="Franklin Gothic Medium")
+
+    if hubs is None or connections is None:
+        hubs, connections = create_plot_data(H)
 
     ########
     # Plot
@@ -243,7 +379,7 @@ def create_plot(H):
     # plt.style.use("dark_background")
 
     # plt.legend(facecolor="white", framealpha=1)
-    fig, ax = plt.subplots(figsize=(10, 10), dpi=300)
+    fig, ax = plt.subplots(figsize=(10, 10))
     ax.set_facecolor("black")
     # ax.legend(facecolor="white", framealpha=1, fontsize="xx-large")
     # ax.spines["top"].set_visible(False)
@@ -254,19 +390,28 @@ def create_plot(H):
     # ax.get_yaxis().set_ticks([])
     ax.axis("off")
     # get Texas plot
-    us_county = gpd.read_file(H.shpfile)
-    # us_county = gpd.read_file('US_COUNTY_SHPFILE/US_county_cont.shp')
-    tx_county = us_county[us_county["STATE_NAME"] == "Texas"]
-    tx = tx_county.dissolve()
-    tx.plot(ax=ax, color="white")
+    tx = get_texas_boundary(H.shpfile)
+    # the outline has many vertices, so it is rasterized in vector (pdf, svg) outputs
+    tx.plot(ax=ax, color="white", rasterized=True)
 
     # Plot hubs
-    hubs = distribution[distribution.type == "Point"]
+    # null checks shared by the option lambdas below, evaluated once
+    hubs["has_production"] = hubs["production"].notnull()
+    hubs["has_consumption"] = hubs["consumption"].notnull()
 
+    # production techs are classified with bitmasks; a hub is thermal (electric)
+    # if all of its techs are thermal (electric), and both if it has some of each
     prod_types = H.get_prod_types()
-    thermal_prod_combos = _all_possible_combos(prod_types["thermal"], existing=True)
-    electric_prod_combos = _all_possible_combos(prod_types["electric"])
-    both_prod_combos = _diff_of_list(thermal_prod_combos, electric_prod_combos)
+    thermal_techs = prod_types["thermal"] + [
+        tech + "Existing" for tech in prod_types["thermal"]
+    ]
+    tech_bits = {
+        tech: 1 << i for i, tech in enumerate(thermal_techs + prod_types["electric"])
+    }
+    thermal_bits = _tech_bits(thermal_techs, tech_bits)
+    electric_bits = _tech_bits(prod_types["electric"], tech_bits)
+    hubs["production_bits"] = _production_bits(hubs["production"].array, tech_bits)
+
     # Options for hub by technology
     hub_plot_tech = {
         "default": {
@@ -274,107 +419,81 @@ def create_plot(H):
             "color": "white",
             "marker": ".",
             "set": None,
-            "b": lambda df: df["production"].isnull(),
+            "b": lambda df: ~df["has_production"],
         },
         "thermal": {
             "name": "Thermal Production",
             "color": "red",
-            "b": lambda df: df["production"].isin(thermal_prod_combos),
+            "b": lambda df: df["has_production"]
+            & ((df["production_bits"] & ~thermal_bits) == 0),
         },
         "electric": {
             "name": "Electric Production",
             "color": "#219ebc",
-            "b": lambda df: df["production"].isin(electric_prod_combos),
+            "b": lambda df: df["has_production"]
+            & ((df["production_bits"] & ~electric_bits) == 0),
         },
         "both": {
             "name": "Therm. and Elec. Production",
             "color": "purple",
-            "b": lambda df: df["production"].isin(both_prod_combos),
+            "b": lambda df: ((df["production_bits"] & thermal_bits) != 0)
+            & ((df["production_bits"] & electric_bits) != 0)
+            & ((df["production_bits"] & ~(thermal_bits | electric_bits)) == 0),
         },
     }
     # if hub_plot_tech["both"]["b"](hubs):
 
-    # Options for hub by Production, Consumption, or both
-    hub_plot_type = {
-        "production": {
-            "name": "Production",
-            "b": lambda df: df["production"].notnull() & df["consumption"].isnull(),
-            "edgecolors": None,
-        },
-        "consumption": {
-            "name": "Consumption (Shape)",
-            "b": lambda df: df["production"].isnull() & df["consumption"].notnull(),
-            "edgecolors": "black",
-        },
-        "both": {
-            "name": "Production and Consumption (Shape)",
-            "b": lambda df: df["production"].notnull() & df["consumption"].notnull(),
-            "edgecolors": "black",
-        },
-    }
-
     # Plot hubs based on production/consumption (marker) options and production tech (color) options
-    # in short, iterates over both of the above option dictionaries
     # the 'b' (boolean) key is a lambda function that returns the locations of where the hubs dataframe
     #   matches the specifications. An iterable way of doing stuff like df[df['production'] == 'smr']
-    [
-        hubs[type_plot["b"](hubs) & tech_plot["b"](hubs)].plot(
-            ax=ax,
-            color=tech_plot["color"],
+    # Each hub is labeled with its matching tech and type option, evaluating each lambda once,
+    # then each (tech, type) group is plotted in a single pass.
+    # Categories keep the groups in the order of the option dictionaries;
+    # hubs that do not match any option are left unlabeled and are not plotted.
+    for column, plot_options in [("tech", hub_plot_tech), ("type", HUB_PLOT_TYPE)]:
+        labels = pd.Series(None, index=hubs.index, dtype=object)
+        for option, option_plot in plot_options.items():
+            labels[option_plot["b"](hubs)] = option
+        hubs[column] = pd.Categorical(labels, categories=list(plot_options))
+
+    # the hubs are points, so they are drawn with ax.scatter directly from their
+    # coordinates instead of through GeoDataFrame.plot
+    hub_xy = shapely.get_coordinates(hubs.geometry.values)
+    hub_marker_size = hubs["production_marker_size"].to_numpy()
+    groups = hubs.groupby(["tech", "type"], observed=True).indices
+    for (tech, type_name), group in groups.items():
+        ax.scatter(
+            hub_xy[group, 0],
+            hub_xy[group, 1],
+            color=hub_plot_tech[tech]["color"],
             marker=".",
-            edgecolors=type_plot["edgecolors"],
+            edgecolors=HUB_PLOT_TYPE[type_name]["edgecolors"],
             zorder=5,
-            markersize=hubs[type_plot["b"](hubs) & tech_plot["b"](hubs)][
-                "production_marker_size"
-            ],
+            s=hub_marker_size[group],
         )
-        for tech, tech_plot in hub_plot_tech.items()
-        for type_name, type_plot in hub_plot_type.items()
-    ]
+    ax.set_aspect("equal")
 
     # Plot connections:
-    # dist_pipelineLowPurity_col = "#9b2226"
-    # dist_pipelineHighPurity_col = "#6A6262"
-    # dist_truckLiquefied_color = "#fb8500"
-    # dist_truckCompressed_color = "#bb3e03"
-    dist_pipelineColor = "#6A6262"
-    dist_truckColor = "#fb8500"
-
-    connections = distribution[distribution.type == "LineString"]
-    roads_connections = connections.copy()
-
-    if not roads_connections.empty:
-        # get data from roads csv, which draws out the road path along a connection
-        roads = roads_to_gdf(H.hubs_dir)
-
-        for row in roads.itertuples():
-            # get road geodata for each connection in connections df
-            hubA = row.startHub
-            hubB = row.endHub
-            roads_connections.loc[
-                (roads_connections["start"] == hubA)
-                & (roads_connections["end"] == hubB),
-                "geometry",
-            ] = row.geometry
-            roads_connections.loc[
-                (roads_connections["end"] == hubA)
-                & (roads_connections["start"] == hubB),
-                "geometry",
-            ] = row.geometry
-
-        roads_connections[
-            (connections["dist_type"] == "dist_pipelineLowPurity")
-            | (connections["dist_type"] == "dist_pipelineHighPurity")
-        ].plot(ax=ax, color=dist_pipelineColor, zorder=1)
-        # roads_connections[connections["dist_type"] == "dist_pipelineHighPurity"].plot(
-        #     ax=ax, color=dist_pipelineHighPurity_col, zorder=1
-        # )
-
-        # change 'road_connections' to 'connections' to plot straight lines
-        roads_connections[
-            (connections["dist_type"] == "dist_truckLiquefied")
-            | (connections["dist_type"] == "dist_truckCompressed")
-        ].plot(ax=ax, color=dist_truckColor, zorder=1)
+    if not connections.empty:
+        # all connections are drawn as one LineCollection, colored by distribution type
+        # trucks are drawn last so that they are on top of pipelines along shared roads
+        plotted = connections[connections["dist_type"].isin(DIST_COLORS)].sort_values(
+            "dist_type",
+            key=lambda dist_type: dist_type.str.startswith("dist_truck"),
+            kind="stable",
+        )
+        coords, line_index = shapely.get_coordinates(
+            plotted.geometry.values, return_index=True
+        )
+        segments = np.split(coords, np.flatnonzero(np.diff(line_index)) + 1)
+        ax.add_collection(
+            LineCollection(
+                segments,
+                colors=plotted["dist_type"].map(DIST_COLORS).to_numpy(),
+                zorder=1,
+            )
+        )
+        ax.autoscale_view()
 
     legend_elements = []
 
@@ -408,7 +527,7 @@ def create_plot(H):
                 markersize=18,
                 markeredgewidth=2,
             )
-            # for type_name, type_plot in hub_plot_type.items()
+            # for type_name, type_plot in HUB_PLOT_TYPE.items()
         ]
     )
     legend_elements.extend(
@@ -416,7 +535,7 @@ def create_plot(H):
             Line2D(
                 [0],
                 [0],
-                color=dist_pipelineColor,
+                color=DIST_PIPELINE_COLOR,
                 lw=2,
                 label="Pipeline",
             ),
@@ -430,7 +549,7 @@ def create_plot(H):
             Line2D(
                 [0],
                 [0],
-                color=dist_truckColor,
+                color=DIST_TRUCK_COLOR,
                 lw=2,
                 label="Truck",
             ),
@@ -456,7 +575,10 @@ def create_plot(H):
     return fig
 
 
-def main():
+def main(render_png=True):
+    """Writes the distribution connections to distribution.fgb (FlatGeobuf)
+    in the outputs directory, for use in interactive maps,
+    and, if render_png is True, the figure to fig.png"""
     from HOwDI.model.HydrogenData import HydrogenData
 
     args = parse_command_line()
@@ -469,7 +591,7 @@ def main():
     )
 
     try:
-        H.output_dict = json.load(open(H.outputs_dir / "outputs.json"))
+        H.output_dict = read_json(H.outputs_dir / "outputs.json")
     except FileNotFoundError:
         from HOwDI.postprocessing.generate_outputs import create_output_dict
 
@@ -477,7 +599,15 @@ def main():
         H.output_dict = create_output_dict(H)
         H.write_output_dict()
 
-    create_plot(H).savefig(H.outputs_dir / "fig.png")
+    hubs, connections = create_plot_data(H)
+    write_dataframe(
+        connections, H.outputs_dir / "distribution.fgb", driver="FlatGeobuf"
+    )
+
+    if render_png:
+        create_plot(H, hubs, connections).savefig(
+            H.outputs_dir / "fig.png", dpi=FIG_DPI
+        )
 
 
 if __name__ == "__main__":
@@ -3,141 +3,173 @@ Converts outputs of Hydrogen model into dataframes and a dictionary
 Author: Braden Pecora
 """
 
-from functools import reduce
-
 import pandas as pd
-from idaes.core.util import to_json
-from numpy import int64, isclose, where
+from numpy import isclose, lexsort, where
 
 pd.options.mode.chained_assignment = None
 
 
-def _recursive_clean(nested_dict):
-    """Removes unnecessary data from Pyomo model serialized as a JSON dict"""
-    black_list = ["__type__", "__id__", "_mutable", "fixed", "stale", "lb", "ub"]
-    for key in list(nested_dict):
-        if key in black_list:
-            del nested_dict[key]
-        elif type(nested_dict[key]) is int64:
-            nested_dict[key] = int(nested_dict[key])
-        elif type(nested_dict[key]) is dict:
-            if key == "data":
-                nested_dict = _recursive_clean(nested_dict[key])
-            else:
-                nested_dict[key] = _recursive_clean(nested_dict[key])
+def _component_data(component):
+    """Returns the values of a Pyomo Var or Param as a dictionary {index: value}
 
-    return nested_dict
+    Indices are formatted as in idaes' to_json (the repr of the index),
+    which is what the index cleaning in create_outputs_dfs expects."""
+    return {repr(index): value for index, value in component.extract_values().items()}
 
 
 def _create_df(label, data):
-    """Creates dataframe from dictionary {data}, changing name of 'value' column to {label}"""
-    df = pd.DataFrame.from_dict(data, orient="index")
-    df = df.rename(columns={"value": label})
-    return df
+    """Creates a dataframe with a single column {label} from a dictionary {index: value}"""
+    return pd.Series(data, name=label).to_frame()
 
 
 def _join_multiple_dfs(dfs_labels, dfs_values):
     """From a dictionary of dataframes ({label: data_frame}) {dfs_values},
     merges all dataframes with label in {dfs_labels}"""
-    dfs = [dfs_values[label] for label in dfs_labels]
-    df = reduce(
-        lambda left, right: pd.merge(
-            left, right, how="outer", left_index=True, right_index=True
-        ),
-        dfs,
-    )
+    # one outer join over all the indices, instead of merging the dataframes pairwise;
+    # rows are sorted by index, as they were by the outer merges
+    df = pd.concat(
+        [dfs_values[label] for label in dfs_labels], axis=1, join="outer"
+    ).sort_index()
     df.reset_index(inplace=True)
-    df = df.fillna("n/a")
     return df
 
 
 def _tuple_split(df, index, name1, name2):
     """Assuming df[index] is a tuple, splits df[index] into df[name1] df[name2]"""
-    # unpack tuples from string, delete old index
-    df[index] = df[index].apply(eval)
-    df.index = pd.MultiIndex.from_tuples(df[index], names=[name1, name2])
+    # unpack tuples from string, e.g. "('a', 'b')", in one regex pass; delete old index
+    names = df[index].str.extract(r"^\('(.*)', '(.*)'\)$")
+    df.index = pd.MultiIndex.from_arrays(
+        [names[0].to_numpy(), names[1].to_numpy()], names=[name1, name2]
+    )
     del df[index]
 
     return df
 
 
-def _create_hub_data(df, hub, start=-1):
-    index_column = df.index.name
+def _group_by_hub(df, hubs):
+    """Splits df into a dictionary {hub: df.to_dict("index")},
+    where {hubs} is the hub of each row of df; rows keep their order"""
+    return {
+        hub: hub_df.to_dict("index") for hub, hub_df in df.groupby(hubs, sort=False)
+    }
+
+
+def _create_hub_data(df, start=-1):
+    """Returns the data of each hub in df as a dictionary {hub: {name: data}}
+
+    The hub is the first part of the index of df (split by the character "_"),
+    and {name} joins the parts of the index from {start} onwards."""
+    # split only as often as needed, so names are sliced from the split
+    # rather than rejoined from every part
+    if start == 0:
+        name = df.index
+    elif start > 0:
+        # indexes with fewer than {start} parts have an empty name
+        name = df.index.str.split("_", n=start).str[start].fillna("")
+    elif start == -1:
+        name = df.index.str.rsplit("_", n=1).str[-1]
+    else:
+        name = df.index.str.rsplit("_", n=-start).str[start:].str.join("_")
+    hubs = df.index.str.split("_", n=1).str[0]
+    return _group_by_hub(df.set_axis(name), hubs)
+
+
+def _create_hub_distribution_data(df):
+    """Returns the distribution data of each hub in df as a dictionary
+    {hub: {"local": {...}, "outgoing": {...}, "incoming": {...}}}
+
+    Arcs are grouped by the hubs at their start and end (the first part of
+    arc_start and arc_end), rather than searching df once for every hub."""
     df = df.reset_index()
-    # find values in index column that match the hub name
-    df = df[df[index_column].str.startswith(hub + "_")]
-    # split values in index column into a list based on the character "_"
-    # takes the indexes from variable {start} in the list and merge back into a single string
-    df[index_column] = (
-        df[index_column]
-        .str.split("_")
-        .str[start:]
-        .apply(lambda x: "_".join(map(str, x)))
-    )
-    df = df.set_index(index_column)
 
-    return df.to_dict("index")
+    # split nodes into the hub and the rest of the node name
+    arc_start = df["arc_start"].str.split("_", n=1)
+    arc_end = df["arc_end"].str.split("_", n=1)
+    start_hub, start_class = arc_start.str[0], arc_start.str[1]
+    end_hub, end_class = arc_end.str[0], arc_end.str[1]
+    is_local = start_hub == end_hub
 
+    local = df[is_local].rename(
+        columns={"arc_start": "source_class", "arc_end": "destination_class"}
+    )
+    local["source_class"] = start_class[is_local]
+    local["destination_class"] = end_class[is_local]
+    local.index = local["source_class"] + "_TO_" + local["destination_class"]
+
+    # arcs between hubs; outgoing arcs drop the hub from their start
+    # ("source_class"), incoming arcs keep it
+    between = df[~is_local & (df["dist_h"] > 0)]
+    between["source"] = start_hub[between.index]
+    between["destination"] = end_hub[between.index]
+    between["destination_class"] = end_class[between.index]
+    between = between.rename(columns={"arc_start": "source_class"})
+
+    outgoing = between.copy()
+    outgoing["source_class"] = start_class[between.index]
+    outgoing.index = outgoing["source_class"] + "_TO_" + outgoing["arc_end"]
+    incoming = between.set_axis(between["source_class"] + "_TO_" + between["arc_end"])
+
+    local = _group_by_hub(local, start_hub[is_local].to_numpy())
+    outgoing = _group_by_hub(outgoing, between["source"].to_numpy())
+    incoming = _group_by_hub(incoming, between["destination"].to_numpy())
 
-def _create_hub_distribution_data(df, hub):
-    # this is largely an abstraction tool to make main less messy
-    df = df.reset_index()
+    return {
+        hub: {
+            "local": local.get(hub, {}),
+            "outgoing": outgoing.get(hub, {}),
+            "incoming": incoming.get(hub, {}),
+        }
+        for hub in local.keys() | outgoing.keys() | incoming.keys()
+    }
 
-    hub_string = hub + "_"  #
-    arc_start = df["arc_start"].str.contains(hub_string)
-    arc_end = df["arc_end"].str.contains(hub_string)
 
-    local = df[arc_start & arc_end]
-    outgoing = df[arc_start & (arc_end == 0)]
-    incoming = df[arc_end & (arc_start == 0)]  # ?not sure this one is necessary
+def _find_price_hub_min(consumption, price_hubs, price_demand):
+    """Returns the rows of consumption of the cheapest price hub that still buys
+    hydrogen, for each price hub demand type at each hub in price_hubs
 
-    local["arc_start"] = local["arc_start"].str.replace(hub_string, "")
-    local["arc_end"] = local["arc_end"].str.replace(hub_string, "")
-    local.index = local["arc_start"] + "_TO_" + local["arc_end"]
-    local = local.rename(
-        columns={"arc_start": "source_class", "arc_end": "destination_class"}
+    Rows are ordered by demand type, then by the order of price_hubs."""
+    demand_types = ["priceFuelStation", "priceLowPurity", "priceHighPurity"]
+    # price hubs are consumers named {hub}_{demand type}_{price}, e.g.,
+    # "austin_priceLowPurity_1.00"; their hub and demand type are parsed once
+    # parts that are not in the categories are missing (NaN)
+    consumer = consumption.index.str.split("_")
+    hub, demand_type = consumer.str[0], consumer.str[1]
+    consumer_hub = pd.Categorical(
+        hub.where(hub.isin(price_hubs)), categories=price_hubs
+    )
+    consumer_type = pd.Categorical(
+        demand_type.where(demand_type.isin(demand_types)), categories=demand_types
     )
 
-    def _out_in_add_info(df):
-        # I'm not sure how python's "pass by object reference" works in for loops so I opted for a function to avoid repeating code
-        df["source"] = df["arc_start"].str.split("_").str[0]
-        df["arc_start"] = df["arc_start"].str.replace(hub_string, "")
-        df.index = df["arc_start"] + "_TO_" + df["arc_end"]
-        df["destination"] = df["arc_end"].str.split("_").str[0]
-        df["destination_class"] = (
-            df["arc_end"].str.split("_").str[1:].apply(lambda x: "_".join(map(str, x)))
-        )
-        df = df.rename(columns={"arc_start": "source_class"})
-        df = df[df["dist_h"] > 0]
-        return df
+    # get all price hubs of the price hub demand types at hubs in 'price_hubs'
+    is_price_hub = (
+        consumer_hub.notna()
+        & consumer_type.notna()
+        & isclose(consumption["cons_h"], price_demand)
+    )
+    price_hubs_df_all = consumption[is_price_hub]
+    consumer_type = consumer_type[is_price_hub]
+    consumer_hub = consumer_hub[is_price_hub]
 
-    outgoing = _out_in_add_info(outgoing)
-    incoming = _out_in_add_info(incoming)
+    # order by demand type, then by price hub
+    order = lexsort((consumer_hub.codes, consumer_type.codes))
+    price_hubs_df_all = price_hubs_df_all.iloc[order]
+    groups = [consumer_type[order], consumer_hub[order]]
 
-    return {
-        "local": local.to_dict("index"),
-        "outgoing": outgoing.to_dict("index"),
-        "incoming": incoming.to_dict("index"),
-    }
+    # find minimum valued price hub that still buys hydrogen,
+    # for each demand type at each price hub
+    min_price = price_hubs_df_all.groupby(groups, observed=True)[
+        "cons_price"
+    ].transform("min")
+    # smallest price hub utilized
+    return price_hubs_df_all[price_hubs_df_all["cons_price"] == min_price]
 
 
 def create_outputs_dfs(m, H):
     hubs_list = H.get_hubs_list()
 
-    outputs = to_json(m, return_dict=True)
-    outputs = outputs["unknown"]["data"]["None"]["__pyomo_components__"]
-    outputs = _recursive_clean(outputs)
-
     ## CREATE DATAFRAME OUTPUTS
-    # create relevant dataframes from json output
-    black_list = ["OBJ"]
-    all_dfs = {
-        key: _create_df(key, value)
-        for key, value in outputs.items()
-        if not ("constr_" in key) and not (key in black_list)
-    }
-
-    # join relevant dataframes
+    # components of the model that are joined into each output dataframe
     merge_lists = {}
     merge_lists["production"] = [
         "can_ccs1",
@@ -186,6 +218,17 @@ def create_outputs_dfs(m, H):
         "dist_flowLimit",
         "dist_h",
     ]
+
+    # create dataframes from the values of the relevant components;
+    # these are read from the model directly, without serializing
+    # the whole model (including sets, constraints, and bounds) first
+    all_dfs = {
+        key: _create_df(key, _component_data(m.find_component(key)))
+        for df_whitelist in merge_lists.values()
+        for key in df_whitelist
+    }
+
+    # join relevant dataframes
     dfs = {
         name: _join_multiple_dfs(df_whitelist, all_dfs)
         for name, df_whitelist in merge_lists.items()
@@ -217,30 +260,9 @@ def create_outputs_dfs(m, H):
 
         price_demand = H.price_demand
 
-        price_hub_min = pd.DataFrame(
-            columns=dfs["consumption"].columns
-        )  # empty df that will contain smallest price hub utilized
-        price_hub_min.index.name = "consumer"
-
-        for demand_type in ["priceFuelStation", "priceLowPurity", "priceHighPurity"]:
-            # get all price hubs of specific demand type
-            price_hubs_df_all = dfs["consumption"][
-                (dfs["consumption"].index.str.contains(demand_type))
-                & (isclose(dfs["consumption"]["cons_h"], price_demand))
-            ]
-
-            for price_hub in price_hubs:
-                # get price hub matching 'price_hub', which are hubs that have price_hubs
-                local_price_hub_df = price_hubs_df_all[
-                    price_hubs_df_all.index.str.contains(price_hub)
-                ]
-                if not local_price_hub_df.empty:
-                    # find minimum valued price hub that still buys hydrogen
-                    breakeven_price_at_hub = local_price_hub_df[
-                        local_price_hub_df["cons_price"]
-                        == local_price_hub_df["cons_price"].min()
-                    ]
-                    price_hub_min = pd.concat([price_hub_min, breakeven_price_at_hub])
+        price_hub_min = _find_price_hub_min(
+            dfs["consumption"], price_hubs, price_demand
+        )
     # remove null data
 
     # find_prices is a binary, price_demand is the demand amount used with price hubs, thus,
@@ -329,7 +351,7 @@ def create_outputs_dfs(m, H):
         ]
     ]
 
-    prod = prod[prod_columns].replace("n/a", 0)
+    prod = prod[prod_columns].fillna(0)
 
     # multiply cost coefficients by prod_h to get total cost
     cols = [
@@ -386,20 +408,33 @@ def create_outputs_dfs(m, H):
     print("Hydrogen Consumed (Tonnes/day): {}".format(total_h_consumed))
     print("Hydrogen Produced (Tonnes/day): {}".format(total_h_produced))
 
+    # missing values are kept as NaN until here, so the columns stay numeric
+    # while the dataframes are filtered and post processed
+    dfs = {name: df.fillna("n/a") for name, df in dfs.items()}
+
     return dfs
 
 
 def create_output_dict(H):
     hubs_list = H.get_hubs_list()
     dfs = H.output_dfs
-    hub_dict = {hub: {} for hub in hubs_list}
-
-    for hub in hubs_list:
-        hub_dict[hub]["production"] = _create_hub_data(dfs["production"], hub)
-        hub_dict[hub]["conversion"] = _create_hub_data(dfs["conversion"], hub)
-        hub_dict[hub]["consumption"] = _create_hub_data(dfs["consumption"], hub, 1)
-        hub_dict[hub]["distribution"] = _create_hub_distribution_data(
-            dfs["distribution"], hub
-        )
+
+    # the data of every hub is split out of each dataframe in one pass
+    hub_data = {
+        "production": _create_hub_data(dfs["production"]),
+        "conversion": _create_hub_data(dfs["conversion"]),
+        "consumption": _create_hub_data(dfs["consumption"], 1),
+    }
+    distribution = _create_hub_distribution_data(dfs["distribution"])
+
+    hub_dict = {
+        hub: {
+            **{key: data.get(hub, {}) for key, data in hub_data.items()},
+            "distribution": distribution.get(
+                hub, {"local": {}, "outgoing": {}, "incoming": {}}
+            ),
+        }
+        for hub in hubs_list
+    }
 
     return hub_dict
@@ -13,11 +13,11 @@ TODO
 Get prices associated with each step
 Generate graphic to show cost breakdown
 """
-import json
-
-from anytree import Node, RenderTree, Resolver
+from anytree import Node
+from anytree.render import ContStyle
 
 from HOwDI.arg_parse import parse_command_line
+from HOwDI.util import read_json
 
 
 class MetaNode(Node):
@@ -61,20 +61,59 @@ class MetaNode(Node):
         # add price later
 
     def get_children(self):
-        r = Resolver("name")
-        return [r.get(child, ".") for child in self.children]
+        return list(self.children)
+
+
+def index_distribution(full_data, key):
+    """Returns the distribution data of each hub grouped by {key} of the distribution,
+    as a dictionary {hub: {scope: {dist_params[key]: [(dist_name, dist_params)]}}}
+
+    Used to look up distribution by {key} directly, rather than searching
+    all of the distribution at a hub every time a node is expanded."""
+    index = {}
+    for hub, hub_data in full_data.items():
+        index[hub] = {}
+        for scope, scope_data in hub_data["distribution"].items():
+            index[hub][scope] = by_key = {}
+            for dist_name, dist_params in scope_data.items():
+                by_key.setdefault(dist_params[key], []).append((dist_name, dist_params))
+    return index
 
 
 def find_children_dist(
-    full_data, parent: MetaNode, current_node: MetaNode, scope="local", past_node=None
+    full_data,
+    parent: MetaNode,
+    current_node: MetaNode,
+    scope="local",
+    past_node=None,
+    dist_index=None,
 ):
-    dist_data = full_data[current_node]["distribution"]
-    destination_class = parent.name
-    if scope == "outgoing":
-        destination_class = destination_class.replace(current_node + "_", "")
-
-    for dist_name, dist_params in dist_data[scope].items():
-        if dist_params["destination_class"] == destination_class:
+    """Adds the distribution upstream of parent to the tree
+
+    The tree is walked depth first from an explicit stack of
+    (parent, current_node, scope, past_node) rather than by recursion,
+    so deep networks do not hit the recursion limit.
+    dist_index is the output of index_distribution by "destination_class",
+    created from full_data if not given."""
+    if dist_index is None:
+        dist_index = index_distribution(full_data, "destination_class")
+
+    stack = [(parent, current_node, scope, past_node)]
+    while stack:
+        parent, current_node, scope, past_node = stack.pop()
+
+        destination_class = parent.name
+        if scope == "outgoing":
+            # incoming source classes are prefixed by their hub, e.g., "austin_dist_..."
+            prefix = current_node + "_"
+            if destination_class.startswith(prefix):
+                destination_class = destination_class[len(prefix) :]
+
+        # upstream searches, in the order that they are walked
+        searches = []
+        for dist_name, dist_params in dist_index[current_node][scope].get(
+            destination_class, []
+        ):
             if scope == "outgoing":
                 if dist_params["destination"] != past_node:
                     continue
@@ -95,34 +134,58 @@ def find_children_dist(
             )
 
             if scope in ["local", "outgoing"]:
-                find_children_dist(full_data, child, current_node)
-                find_children_dist(full_data, child, current_node, "incoming")
+                searches.append((child, current_node, "local", None))
+                searches.append((child, current_node, "incoming", None))
             elif scope == "incoming":
                 new_node = dist_params["source"]
-                find_children_dist(full_data, child, new_node, "outgoing", current_node)
+                searches.append((child, new_node, "outgoing", current_node))
+
+        stack.extend(reversed(searches))
 
 
 def find_percent_downstream(parent: MetaNode):
-    children = parent.get_children()
-    total_child_h = sum([child.h for child in children])
-    for child in children:
-        child.percent_downstream = parent.h / total_child_h
-        child.h_downstream = child.percent_downstream * child.h
-        # change the above into a method so that price fraction can be updated
-        find_percent_downstream(child)
+    stack = [parent]
+    while stack:
+        parent = stack.pop()
+        children = parent.get_children()
+        total_child_h = sum(child.h for child in children)
+        # every child sends the same percent of its hydrogen downstream;
+        # children without any hydrogen send none
+        percent_downstream = parent.h / total_child_h if total_child_h else 0
+        for child in children:
+            child.percent_downstream = percent_downstream
+            child.h_downstream = percent_downstream * child.h
+            # change the above into a method so that price fraction can be updated
+        stack.extend(children)
+
+
+def render_tree(parent, describe):
+    """Returns the lines of the tree below parent, drawn like anytree's RenderTree,
+    where describe(node) is the text of each node
+
+    The prefixes are built from an explicit stack as the tree is walked,
+    rather than by walking back up the tree for every node."""
+    style = ContStyle()
+    lines = []
+    stack = [(parent, "", "")]
+    while stack:
+        node, pre, fill = stack.pop()
+        lines.append(pre + describe(node))
+
+        children = node.children
+        for i in reversed(range(len(children))):
+            if i == len(children) - 1:
+                stack.append((children[i], fill + style.end, fill + style.empty))
+            else:
+                stack.append((children[i], fill + style.cont, fill + style.vertical))
+    return lines
 
 
 def print_tree(parent: MetaNode):
-    for pre, fill, node in RenderTree(parent):
-        # if isinstance(node, MetaNode):
-        #     h = node.h
-        # else:
-        #     h = None
-        print(
-            "{}{} ({:2.2f}*{:2.2f}%={:2.2f})".format(
-                pre, node.name, node.h, 100 * node.percent_downstream, node.h_downstream
-            )
-        )
+    describe = lambda node: "{} ({:2.2f}*{:2.2f}%={:2.2f})".format(
+        node.name, node.h, 100 * node.percent_downstream, node.h_downstream
+    )
+    print("\n".join(render_tree(parent, describe)))
 
 
 def trace_back(hub, full_data):
@@ -132,6 +195,7 @@ def trace_back(hub, full_data):
 
     local_data = full_data[hub]
     hub_metanode = MetaNode(hub)
+    dist_index = index_distribution(full_data, "destination_class")
 
     for consumer_name, consumer_data in local_data["consumption"].items():
         consumer_node = MetaNode(
@@ -141,7 +205,7 @@ def trace_back(hub, full_data):
             scope="local",
         )
 
-        find_children_dist(full_data, consumer_node, hub)
+        find_children_dist(full_data, consumer_node, hub, dist_index=dist_index)
     find_percent_downstream(hub_metanode)
     print_tree(hub_metanode)
 
@@ -150,7 +214,7 @@ def main():
     args = parse_command_line()
 
     try:
-        data = json.load(open(args.scenario_dir + "/outputs/outputs.json"))
+        data = read_json(args.scenario_dir + "/outputs/outputs.json")
     except FileNotFoundError:
         from HOwDI.model.HydrogenData import HydrogenData
         from HOwDI.postprocessing.generate_outputs import create_output_dict
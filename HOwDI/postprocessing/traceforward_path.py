@@ -13,12 +13,13 @@ Parent hydrogen -> (feeds into) total mass above node (sum of parent hydrogen),
 sum of parent hydrogen * percent sent downstream (from sum) = hydrogen at node 
 """
 
-import json
 from math import isclose
 
-from anytree import Node, RenderTree, Resolver
+from anytree import Node
 
 from HOwDI.arg_parse import parse_command_line
+from HOwDI.postprocessing.traceback_path import index_distribution, render_tree
+from HOwDI.util import read_json
 
 
 class MetaNode(Node):
@@ -71,13 +72,11 @@ class MetaNode(Node):
 
     def get_siblings(self):
         """get siblings associated with node, only works after tree created"""
-        r = Resolver("name")
-        return [r.get(sibling, ".") for sibling in self.siblings]
+        return list(self.siblings)
 
     def get_children(self):
         """get children associated with node, only works after tree created"""
-        r = Resolver("name")
-        return [r.get(child, ".") for child in self.children]
+        return list(self.children)
 
     def get_percent_of_parent(self):
         """
@@ -127,16 +126,30 @@ class MetaNode(Node):
         return out
 
 
-def find_children_prod(full_data, parent_node, current_hub=None, title=None):
+def find_children_prod(
+    full_data, parent_node, current_hub=None, title=None, dist_index=None
+):
     # current node is the city
     # title is the type, i.e., "demandSector_existing", "smrExisting"
     # order is production, distribution, conversion, consumption
-
-    # distribution
-    dist_data = full_data[current_hub]["distribution"]
-    for scope_of_child in ["local", "outgoing"]:
-        for dist_name, dist_params in dist_data[scope_of_child].items():
-            if dist_params["source_class"] == title:
+    # dist_index is the output of index_distribution by "source_class"
+    if dist_index is None:
+        dist_index = index_distribution(full_data, "source_class")
+
+    # the tree is walked depth first from an explicit stack of
+    # (parent_node, current_hub, title) rather than by recursion,
+    # so deep networks do not hit the recursion limit
+    stack = [(parent_node, current_hub, title)]
+    while stack:
+        parent_node, current_hub, title = stack.pop()
+
+        # downstream searches, in the order that they are walked
+        searches = []
+
+        # distribution
+        dist_data = dist_index[current_hub]
+        for scope_of_child in ["local", "outgoing"]:
+            for dist_name, dist_params in dist_data[scope_of_child].get(title, []):
                 destination_class = dist_params["destination_class"]
 
                 if scope_of_child == "outgoing":
@@ -151,25 +164,25 @@ def find_children_prod(full_data, parent_node, current_hub=None, title=None):
                     order="distribution",
                 )
 
-                find_children_prod(
-                    full_data, child, current_hub=current_hub, title=destination_class
-                )
+                searches.append((child, current_hub, destination_class))
 
-    # consumption
-    for consumer_name, consumer_data in full_data[current_hub]["consumption"].items():
-        if consumer_name == title:
+        # consumption
+        consumer_data = full_data[current_hub]["consumption"].get(title)
+        if consumer_data is not None:
             child = MetaNode(
-                name=consumer_name,
+                name=title,
                 parent=parent_node,
                 hub=current_hub,
                 data=consumer_data,
                 order="consumption",
             )
 
+        stack.extend(reversed(searches))
+
 
 def print_tree(parent):
-    for pre, fill, node in RenderTree(parent):
-        print("{}{} ({})".format(pre, node.print_name, node.get_mass_equation()))
+    describe = lambda node: "{} ({})".format(node.print_name, node.get_mass_equation())
+    print("\n".join(render_tree(parent, describe)))
 
 
 def trace_forward(hub_name, full_data):
@@ -180,6 +193,7 @@ def trace_forward(hub_name, full_data):
     parent_node = MetaNode(hub_name, hub="origin")
 
     local_data = full_data[hub_name]
+    dist_index = index_distribution(full_data, "source_class")
 
     for producer_name, producer_data in local_data["production"].items():
         producer_node = MetaNode(
@@ -195,6 +209,7 @@ def trace_forward(hub_name, full_data):
             producer_node,
             title="production_{}".format(producer_name),
             current_hub=hub_name,
+            dist_index=dist_index,
         )
 
     print_tree(parent_node)
@@ -204,7 +219,7 @@ def main():
     args = parse_command_line()
 
     try:
-        data = json.load(open(args.scenario_dir + "outputs/outputs.json"))
+        data = read_json(args.scenario_dir + "outputs/outputs.json")
     except FileNotFoundError:
         from HOwDI.model.HydrogenData import HydrogenData
         from HOwDI.postprocessing.generate_outputs import create_output_dict
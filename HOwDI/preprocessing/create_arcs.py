@@ -21,8 +21,10 @@ from pathlib import Path
 
 import geopandas as gpd
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 import requests
+import shapely
 from shapely.geometry import LineString
 
 s = requests.Session()  # improve performance over API calls
@@ -50,17 +52,33 @@ def get_route(hubA, hubB):
     return json.loads(r.text)["routes"][0]
 
 
-def make_route(row):
-    line = list(row.coords)
-    hubA = Hub(line[0])
-    hubB = Hub(line[1])
+def make_routes(lines):
+    """Finds the road route along each straight line in `lines` (a GeoSeries)
 
-    route = get_route(hubA, hubB)
-    road_geometry = LineString(route["geometry"]["coordinates"])
-    km_distance = route["distance"] / 1000
-    duration = route["duration"]
+    All routes are fetched first, then the road geometries are built
+    in a single call to `shapely.linestrings` rather than one LineString per arc.
+    """
+    routes = [get_route(*(Hub(coords) for coords in line.coords)) for line in lines]
+    if not routes:
+        return pd.DataFrame(
+            columns=["road_duration", "kmLength_road", "road_geometry"],
+            index=lines.index,
+        )
+
+    coords = [route["geometry"]["coordinates"] for route in routes]
+    road_geometry = shapely.linestrings(
+        np.concatenate(coords),
+        indices=np.repeat(np.arange(len(coords)), [len(c) for c in coords]),
+    )
 
-    return pd.Series([duration, km_distance, road_geometry])
+    return pd.DataFrame(
+        {
+            "road_duration": [route["duration"] for route in routes],
+            "kmLength_road": [route["distance"] / 1000 for route in routes],
+            "road_geometry": road_geometry,
+        },
+        index=lines.index,
+    )
 
 
 def create_arcs(geohubs, hubs_dir, create_fig=False, shpfile=None):
@@ -101,8 +119,8 @@ def create_arcs(geohubs, hubs_dir, create_fig=False, shpfile=None):
             )
         else:
             # TODO make generic
-            us_county = gpd.read_file(shpfile)
-            tx_county = us_county[us_county["STATE_NAME"] == "Texas"]
+            # filter by state while reading (GDAL attribute filter)
+            tx_county = gpd.read_file(shpfile, where="STATE_NAME = 'Texas'")
             tx = tx_county.dissolve().to_crs(epsg=epsg)
             tx.plot(ax=ax, color="white", edgecolor="black")
 
@@ -124,12 +142,21 @@ def create_arcs(geohubs, hubs_dir, create_fig=False, shpfile=None):
     # get euclidian distance
     gdf["mLength_euclid"] = hubA.distance(hubB)
 
+    # get list of tuples that describe the connections for each hub,
+    # built in a single pass over all combinations
+    hub_connections = {hub: [] for hub in hubs}
+    for connection in hubs_combinations:
+        hub_connections[connection[0]].append(connection)
+        hub_connections[connection[1]].append(connection)
+
+    euclid_lengths = gdf["mLength_euclid"].to_dict()
+
     class _Connections:
         def __init__(self, hub):
             self.hub = hub
 
-            # get list of tuples that describe the connection for this hub
-            self.connections = list(filter(lambda x: hub in x, hubs_combinations))
+            # copy, since connections are removed while trimming
+            self.connections = list(hub_connections[hub])
 
             # number of connections
             self.n = len(self.connections)
@@ -158,8 +185,10 @@ def create_arcs(geohubs, hubs_dir, create_fig=False, shpfile=None):
 
         def _make_length_dict(self):
             # make dictionary that describes euclidian distance to destination
-            distances = list(gdf.loc[self.connections]["mLength_euclid"])
-            d = {self.dests[i]: distances[i] for i in range(len(distances))}
+            d = {
+                dest: euclid_lengths[connection]
+                for dest, connection in zip(self.dests, self.connections)
+            }
             # considered sorting for optimization purposes but didn't seem to do anything
             return d
 
@@ -293,9 +322,9 @@ def create_arcs(geohubs, hubs_dir, create_fig=False, shpfile=None):
 
     # get gdf in latlong coords, turn find road distances and geometries
     gdf_latlong = gdf_trimmed.to_crs(crs=lat_long_crs)
-    gdf_latlong[["road_duration", "kmLength_road", "road_geometry"]] = gdf_latlong[
-        "LINE"
-    ].apply(make_route)
+    gdf_latlong[["road_duration", "kmLength_road", "road_geometry"]] = make_routes(
+        gdf_latlong["LINE"]
+    )
     gdf_roads = (
         gdf_latlong.set_geometry("road_geometry")
         .set_crs(crs=lat_long_crs)
@@ -18,7 +18,7 @@ def main():
         out_dir.mkdir(exist_ok=True)
 
     print("Geocoding...")
-    geohubs = geocode_hubs(hub_dir / "hubs.csv")
+    geohubs = geocode_hubs(hub_dir / "hubs.csv", provider=args.geocoder)
     geohubs.to_file(out_dir / "hubs.geojson", driver="GeoJSON")
 
     if args.replace_model_inputs:
@@ -1,39 +1,188 @@
+import hashlib
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from math import nan
+from pathlib import Path
+
 import pandas as pd
 import geopandas as gpd
-from geopy.geocoders import Nominatim  # necessary installation, unnecessary import
+import requests
 
+from HOwDI.util import read_config
 
-def camel_case_split(str):
-    # adapted from https://www.geeksforgeeks.org/python-split-camelcase-string-to-individual-strings/
-    words = [[str[0]]]
+s = requests.Session()  # reuse the connection across batches
+
+ARCGIS_BATCH_URL = "https://geocode.arcgis.com/arcgis/rest/services/World/GeocodeServer/geocodeAddresses"
+GEOCODE_CACHE_DIR = Path("~/.cache/HOwDI/geocode").expanduser()
+
+# zero-width match between a lowercase letter and an uppercase letter
+CAMEL_CASE_BOUNDARY = re.compile(r"(?<=[a-z])(?=[A-Z])")
 
-    for c in str[1:]:
-        if words[-1][-1].islower() and c.isupper():
-            words.append(list(c))
-        else:
-            words[-1].append(c)
 
-    words = ["".join(word) for word in words]
+def camel_case_split(str):
+    """Splits a camelCase string into words and capitalizes the first,
+    e.g., montBelvieu -> Mont Belvieu"""
+    words = CAMEL_CASE_BOUNDARY.split(str)
     words[0] = words[0].capitalize()
     return " ".join(words)
 
 
-def geocode_hubs(file="hubs.csv"):
-    """Generates a GeoJSON file from geocoded locations of hub (detailed hubs.csv)"""
+def geocode_nominatim(queries, max_workers=10, min_delay_seconds=1):
+    """Geocodes a list of strings with Nominatim, returning a list of (address, x, y)
+
+    Queries that are not found (or whose request failed) are returned as
+    (None, nan, nan).
+
+    Requests are issued from a thread pool that shares one geocoder (and thus one
+    HTTP session). The public Nominatim server allows one request per second, so calls
+    are spaced by `min_delay_seconds`; the thread pool only overlaps the time spent
+    waiting on responses. Set `min_delay_seconds` to 0 for a self-hosted server.
+    """
+    # geopy is only needed here, so it is not imported with the module
+    from geopy.extra.rate_limiter import RateLimiter
+    from geopy.geocoders import Nominatim
+
+    geolocator = Nominatim(user_agent="HOwDI")
+    geocode = RateLimiter(geolocator.geocode, min_delay_seconds=min_delay_seconds)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        locations = list(executor.map(geocode, queries))
+
+    return [
+        (None, nan, nan)
+        if location is None
+        else (location.address, location.longitude, location.latitude)
+        for location in locations
+    ]
+
+
+def geocode_arcgis(queries, token, batch_size=150, max_workers=4):
+    """Geocodes a list of strings with the ArcGIS `geocodeAddresses` batch endpoint,
+    returning a list of (address, x, y)
+
+    Sends one request per `batch_size` queries instead of one per query.
+    The World Geocoding Service allows at most 150 records per batch
+    and requires an ArcGIS token. Batches are sent concurrently from a thread pool
+    of `max_workers` threads.
+    """
+
+    def geocode_batch(start):
+        records = [
+            {"attributes": {"OBJECTID": i, "SingleLine": query}}
+            for i, query in enumerate(queries[start : start + batch_size], start)
+        ]
+        r = s.post(
+            ARCGIS_BATCH_URL,
+            data={
+                "addresses": json.dumps({"records": records}),
+                "outSR": 4326,
+                "f": "json",
+                "token": token,
+            },
+        )
+        r.raise_for_status()
+        return r.json()["locations"]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        batches = list(executor.map(geocode_batch, range(0, len(queries), batch_size)))
+
+    # locations are not guaranteed to be returned in the order they were sent
+    results = {
+        location["attributes"]["ResultID"]: (
+            location["address"],
+            location["location"]["x"],
+            location["location"]["y"],
+        )
+        for locations in batches
+        for location in locations
+    }
+
+    return [results[i] for i in range(len(queries))]
+
+
+def geocode_cached(queries, geocoder, cache_dir):
+    """Geocodes a list of strings with `geocoder`, skipping queries that were
+    already geocoded and stored in `cache_dir`
+
+    Each result is stored as a JSON file named after the sha1 hash of its query.
+    Only queries without a cache file are passed to `geocoder`, which must
+    return a list of (address, x, y). Queries that were not found (address None)
+    are not stored, so they are geocoded again on the next run.
+    """
+    paths = {
+        query: cache_dir / hashlib.sha1(query.encode()).hexdigest() for query in queries
+    }
+
+    locations = {}
+    for query, path in paths.items():
+        if path.exists():
+            cached = json.loads(path.read_text())
+            locations[query] = (cached["address"], cached["x"], cached["y"])
+
+    uncached = [query for query in paths if query not in locations]
+    if uncached:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        for query, location in zip(uncached, geocoder(uncached)):
+            locations[query] = location
+            if location[0] is None:
+                continue
+            paths[query].write_text(
+                json.dumps(dict(zip(("address", "x", "y"), location)))
+            )
+
+    return [locations[query] for query in queries]
+
+
+def geocode_hubs(file="hubs.csv", provider="nominatim", use_cache=True):
+    """Generates a GeoJSON file from geocoded locations of hub (detailed hubs.csv)
+
+    provider is either "nominatim" or "arcgis". The ArcGIS token is read from the
+    `arcgis_token` key of the config (see README).
+    If use_cache is True, hubs geocoded on a previous run are read from
+    GEOCODE_CACHE_DIR instead of being sent to the provider."""
 
     hubs = pd.read_csv(file)["hub"].tolist()
     hubs_cc = [camel_case_split(hub) + ", Texas" for hub in hubs]
 
-    geohubs = gpd.tools.geocode(
-        hubs_cc, provider="nominatim", user_agent="HOwDI"
-    ).set_index(pd.Series(hubs, name="hub"))
+    if provider == "nominatim":
+        geocoder = geocode_nominatim
+    elif provider == "arcgis":
+        token = read_config().get("arcgis_token")
+        if token is None:
+            raise ValueError(
+                "The arcgis geocoder requires an `arcgis_token` in the config."
+            )
+        geocoder = lambda queries: geocode_arcgis(queries, token)
+    else:
+        raise ValueError("Geocoder '{}' is not supported.".format(provider))
 
-    geohubs["County"] = [
-        word.lstrip()
-        for words in geohubs["address"].str.split(",")
-        for word in words
-        if ("County") in word
-    ]
+    if use_cache:
+        locations = geocode_cached(hubs_cc, geocoder, GEOCODE_CACHE_DIR / provider)
+    else:
+        locations = geocoder(hubs_cc)
+
+    not_found = [hub for hub, location in zip(hubs, locations) if location[0] is None]
+    if not_found:
+        print(
+            "The following hubs could not be geocoded and have no location: "
+            + ", ".join(not_found)
+        )
+
+    addresses, xs, ys = zip(*locations)
+    geohubs = gpd.GeoDataFrame(
+        {"address": addresses},
+        geometry=gpd.points_from_xy(xs, ys),
+        index=pd.Index(hubs, name="hub"),
+        crs="EPSG:4326",
+    )
+
+    # first comma-separated part of the address that contains "County"; NaN if none
+    geohubs["County"] = (
+        geohubs["address"]
+        .str.extract(r"(?:^|,)([^,]*County[^,]*)", expand=False)
+        .str.strip()
+    )
 
     return geohubs
 
@@ -2,8 +2,7 @@ from HOwDI.arg_parse import parse_command_line
 from HOwDI.model.create_model import build_h2_model
 from HOwDI.model.create_network import build_hydrogen_network
 from HOwDI.model.HydrogenData import HydrogenData
-from HOwDI.postprocessing.create_plot import create_plot
-from HOwDI.postprocessing.generate_outputs import create_outputs_dfs, create_output_dict
+from HOwDI.postprocessing.generate_outputs import create_outputs_dfs
 
 
 def main():
@@ -28,15 +27,19 @@ def main():
 
     # write outputs to json
     if args.output_json:
-        H.output_dict = create_output_dict(H)
+        H.create_output_dict()
         H.write_output_dict()
 
     # create figure
     if args.output_fig:
+        # imported here so that geopandas and matplotlib only load when plotting
+        from HOwDI.postprocessing.create_plot import FIG_DPI, create_plot
+
         if not args.output_json:
-            H.output_dict = create_output_dict(H)
+            H.create_output_dict()
         create_plot(H).savefig(
             H.outputs_dir / "fig.png",
+            dpi=FIG_DPI,
             bbox_inches="tight",
             pad_inches=0,
             # facecolor="black",
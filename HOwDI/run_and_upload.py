@@ -1,11 +1,13 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
-import yaml
 from sqlalchemy import create_engine
 
 from HOwDI.model.create_model import build_h2_model
 from HOwDI.model.create_network import build_hydrogen_network
 from HOwDI.model.HydrogenData import HydrogenData
 from HOwDI.postprocessing.generate_outputs import create_outputs_dfs
+from HOwDI.util import read_yaml
 
 
 def run_and_upload(engine, settings, dfs, uuid=None, trial_number=None):
@@ -25,8 +27,7 @@ def run_and_upload(engine, settings, dfs, uuid=None, trial_number=None):
 def main():
     engine = create_engine("sqlite:///C:/Users/bpeco/Box/h2@scale/h2_model/test.sqlite")
 
-    with open("../scenarios/base/inputs/settings.yml") as f:
-        settings = yaml.load(f, Loader=yaml.FullLoader)
+    settings = read_yaml("../scenarios/base/inputs/settings.yml")
 
     fns = [
         "production_thermal",
@@ -40,7 +41,10 @@ def main():
         "production_existing",
         "ccs",
     ]
-    dfs = {fn: pd.read_csv("../scenarios/base/inputs/" + fn + ".csv") for fn in fns}
+    read_input = lambda fn: pd.read_csv("../scenarios/base/inputs/" + fn + ".csv")
+    # pandas' C parser releases the GIL, so the files can be read concurrently
+    with ThreadPoolExecutor(max_workers=min(8, len(fns))) as executor:
+        dfs = dict(zip(fns, executor.map(read_input, fns)))
 
     run_and_upload(engine, settings, dfs)
 
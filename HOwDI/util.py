@@ -1,34 +1,74 @@
 import copy
 import json
+from functools import lru_cache
 from pathlib import Path
 from importlib_metadata import distributions
 
 import pandas as pd
 import yaml
 from pydantic.v1.utils import deep_update
-from sqlalchemy import create_engine
+from sqlalchemy import bindparam, create_engine, text
+
+
+# use the LibYAML-based loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as YAMLLoader
+except ImportError:
+    from yaml import SafeLoader as YAMLLoader
 
 
 def read_yaml(fn):
     with open(fn) as f:
-        return yaml.load(f, Loader=yaml.FullLoader)
+        return yaml.load(f, Loader=YAMLLoader)
+
+
+# orjson encodes and decodes large files (e.g., outputs.json) several times faster than json
+try:
+    import orjson
+
+    json_loads = orjson.loads
+
+    def json_dumps(obj):
+        return orjson.dumps(
+            obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+        )
+
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj):
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def read_json(fn):
+    with open(fn, "rb") as f:
+        return json_loads(f.read())
+
+
+def write_json(obj, fn):
+    with open(fn, "wb") as f:
+        f.write(json_dumps(obj))
+
+
+CONFIG_PATH = Path(__file__).resolve().parent / "config.yml"
+CONFIG_LOCAL_PATH = CONFIG_PATH.with_name("config_local.yml")
 
 
 def read_config() -> dict:
-    p = Path(__file__).parents[0]
-    yaml_out = read_yaml(p / "config.yml")
+    yaml_out = read_yaml(CONFIG_PATH)
 
-    config_local_path = p / "config_local.yml"
-    if config_local_path.exists():
-        yaml_out.update(read_yaml(config_local_path))
+    if CONFIG_LOCAL_PATH.exists():
+        yaml_out.update(read_yaml(CONFIG_LOCAL_PATH))
 
     return yaml_out
 
 
+@lru_cache(maxsize=None)
 def create_db_engine(db=None):
-    config = read_config()
+    """Returns a SQLAlchemy engine for `db` (defaults to the config's "db").
+    Engines are cached, so repeated calls share one engine and connection pool."""
     if db is None:
-        db = config.get("db")
+        db = read_config().get("db")
     engine = create_engine(db)
     return engine
 
@@ -39,32 +79,38 @@ def get_metadata(uuid, engine=None):
 
     with engine.connect() as con:
         metadata = con.execute(
-            f"""SELECT metadata FROM metadata WHERE uuid = '{uuid}'"""
-        )
-        metadata = [r for r in metadata][0][0]
+            text("SELECT metadata FROM metadata WHERE uuid = :uuid"),
+            {"uuid": str(uuid)},
+        ).fetchone()[0]
 
     metadata = json.loads(metadata)
     return metadata
 
 
+def get_metadata_batch(uuids, engine=None):
+    """Returns a dictionary {uuid: metadata} for all `uuids` using a single query"""
+    if engine is None:
+        engine = create_db_engine()
+
+    sql = text("SELECT uuid, metadata FROM metadata WHERE uuid IN :uuids").bindparams(
+        bindparam("uuids", expanding=True)
+    )
+    with engine.connect() as con:
+        rows = con.execute(sql, {"uuids": [str(uuid) for uuid in uuids]})
+        return {uuid: json.loads(metadata) for uuid, metadata in rows}
+
+
 def get_number_of_trials(uuid, engine=None):
     metadata = get_metadata(uuid=uuid, engine=engine)
     return metadata["metadata"]["number_of_trials"]
 
 
 def _continue_flattening(dd):
-    """Filter than returns true if
+    """Filter that returns true if
     item is dictionary but dictionary does not have keys
     "distribution" or "parameters".
     """
-    if isinstance(dd, dict):
-        ks = dd.keys()
-        if "distriubiton" in ks or "parameters" in ks:
-            return False
-        else:
-            return True
-    else:
-        return False
+    return isinstance(dd, dict) and dd.keys().isdisjoint(("distribution", "parameters"))
 
 
 def flatten_dict(
@@ -77,41 +123,57 @@ def flatten_dict(
     Flattens dict based on `_continue_flattening`, which stop flattening
     the dict if the next value is a) not a dict or b) has the keys
     "distribution" and/or "parameters".
+
+    Traverses with an explicit stack rather than recursion;
+    items are pushed in reverse so that the output keeps the input's order.
     """
-    return (
-        {
-            prefix + separator + k if prefix else k: v
-            for kk, vv in dd.items()
-            for k, v in flatten_dict(vv, flattener, separator, kk).items()
-        }
-        if flattener(dd)
-        else {prefix: dd}
-    )
+    out = {}
+    stack = [(prefix, dd)]
+    while stack:
+        p, node = stack.pop()
+        if flattener(node):
+            stack.extend(
+                (p + separator + k if p else k, v) for k, v in reversed(node.items())
+            )
+        else:
+            out[p] = node
+    return out
 
 
 def truncate_dict(d, filter=_continue_flattening):
     """Truncates a dictionary based on a filter
-    At the spot of truncation, the value becomes the keys"""
-
-    def truncate_dict_inner(dd):
-        """Filtered sets become null dictionaries"""
-        return {
-            key1: truncate_dict_inner(val1) if isinstance(val1, dict) else val1
-            for key1, val1 in dd.items()
-            if filter(dd)
-        }
-
-    d1 = truncate_dict_inner(d)
-
-    def remove_null(dd):
-        """Turns location of null dictionaries into list of keys"""
-        if isinstance(dd, dict):
-            if any([v == {} for v in dd.values()]):
-                return dict_keys_to_list(dd)
+    At the spot of truncation, the value becomes the keys
+
+    Dictionaries that do not pass the filter are truncated. A dictionary
+    containing a truncated (or empty) dictionary becomes the list of its keys;
+    any other non-dictionary value becomes None.
+    Done in a single traversal with an explicit stack.
+    """
+
+    def is_truncated(v):
+        return isinstance(v, dict) and not (v and filter(v))
+
+    def has_truncated_value(dd):
+        return any(is_truncated(v) for v in dd.values())
+
+    if is_truncated(d):
+        return {}
+    if has_truncated_value(d):
+        return dict_keys_to_list(d)
+
+    d2 = {}
+    stack = [(d, d2)]
+    while stack:
+        dd, out = stack.pop()
+        for key, val in dd.items():
+            if not isinstance(val, dict):
+                out[key] = None
+            elif has_truncated_value(val):
+                out[key] = dict_keys_to_list(val)
             else:
-                return {k: remove_null(v) for k, v in dd.items()}
+                out[key] = {}
+                stack.append((val, out[key]))
 
-    d2 = remove_null(d1)
     return d2
 
 
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from HOwDI.postprocessing.generate_outputs import _find_price_hub_min
+
+DEMAND_TYPES = ["priceFuelStation", "priceLowPurity", "priceHighPurity"]
+
+
+def _price_hub_min_loop(consumption, price_hubs, price_demand):
+    """The original per-hub loop of create_outputs_dfs"""
+    price_hub_min = pd.DataFrame(columns=consumption.columns)
+    price_hub_min.index.name = "consumer"
+
+    for demand_type in DEMAND_TYPES:
+        price_hubs_df_all = consumption[
+            (consumption.index.str.contains(demand_type))
+            & (np.isclose(consumption["cons_h"], price_demand))
+        ]
+
+        for price_hub in price_hubs:
+            local_price_hub_df = price_hubs_df_all[
+                price_hubs_df_all.index.str.contains(price_hub)
+            ]
+            if not local_price_hub_df.empty:
+                breakeven_price_at_hub = local_price_hub_df[
+                    local_price_hub_df["cons_price"]
+                    == local_price_hub_df["cons_price"].min()
+                ]
+                price_hub_min = pd.concat([price_hub_min, breakeven_price_at_hub])
+    return price_hub_min
+
+
+def _consumption(price_hubs, price_demand, seed=0):
+    """consumption output with price hubs at every hub in price_hubs,
+    of which a random selection buys hydrogen, and a regular consumer at each hub"""
+    rng = np.random.default_rng(seed)
+    prices = [round(p, 2) for p in np.arange(1, 5, 0.25)]
+
+    index, cons_h, cons_price = [], [], []
+    # hubs are listed in a different order than price_hubs
+    for hub in reversed(price_hubs):
+        index.append(f"{hub}_demandSector_industrialFuel")
+        cons_h.append(100.0)
+        cons_price.append(2.0)
+        for demand_type in DEMAND_TYPES:
+            for price in prices:
+                index.append(f"{hub}_{demand_type}_{price:.2f}")
+                cons_h.append(price_demand if rng.random() < 0.5 else 0.0)
+                cons_price.append(price)
+
+    return pd.DataFrame(
+        {"cons_h": cons_h, "cons_price": cons_price},
+        index=pd.Index(index, name="consumer"),
+    )
+
+
+@pytest.mark.parametrize("n_hubs", [44, 130])
+def test_find_price_hub_min_matches_loop(n_hubs):
+    # hub names are not substrings of each other, as the loop matches by substring
+    price_hubs = [f"hub{i:03d}x" for i in range(n_hubs)]
+    price_demand = 0.01
+    consumption = _consumption(price_hubs, price_demand)
+
+    expected = _price_hub_min_loop(consumption, price_hubs, price_demand)
+    result = _find_price_hub_min(consumption, price_hubs, price_demand)
+
+    assert list(result.index) == list(expected.index)
+    pd.testing.assert_frame_equal(
+        result, expected, check_dtype=False, check_index_type=False
+    )
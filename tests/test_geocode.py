@@ -0,0 +1,46 @@
+import math
+from collections import namedtuple
+
+import geopy.geocoders
+
+from HOwDI.preprocessing.geocode import geocode_cached, geocode_nominatim
+
+Location = namedtuple("Location", ["address", "longitude", "latitude"])
+
+
+class StubNominatim:
+    """Stands in for geopy's Nominatim; queries starting with "Nowhere" are not found"""
+
+    def __init__(self, user_agent=None):
+        pass
+
+    def geocode(self, query):
+        if query.startswith("Nowhere"):
+            return None
+        return Location(query + ", United States", -97.7, 30.3)
+
+
+def test_geocode_nominatim_not_found(monkeypatch):
+    monkeypatch.setattr(geopy.geocoders, "Nominatim", StubNominatim)
+
+    locations = geocode_nominatim(
+        ["Austin, Texas", "Nowhere, Texas"], min_delay_seconds=0
+    )
+
+    assert locations[0] == ("Austin, Texas, United States", -97.7, 30.3)
+    address, x, y = locations[1]
+    assert address is None
+    assert math.isnan(x) and math.isnan(y)
+
+
+def test_geocode_cached_skips_not_found(monkeypatch, tmp_path):
+    monkeypatch.setattr(geopy.geocoders, "Nominatim", StubNominatim)
+    geocoder = lambda queries: geocode_nominatim(queries, min_delay_seconds=0)
+
+    queries = ["Austin, Texas", "Nowhere, Texas"]
+    locations = geocode_cached(queries, geocoder, tmp_path)
+
+    assert locations[0][0] == "Austin, Texas, United States"
+    assert locations[1][0] is None
+    # only the location that was found is cached
+    assert len(list(tmp_path.iterdir())) == 1